@@ -0,0 +1,92 @@
+import secrets
+import threading
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .profiling import StackSampler, render_collapsed, sample_for
+from .settings import settings
+
+"""
+
+Operational endpoints for administrators, guarded by the BE_TASK_CA_ADMIN_TOKEN
+shared secret. Without a configured token they do not exist.
+
+"""
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+PROFILE_HEADER = "X-Profile"
+
+
+def is_admin(token: str | None) -> bool:
+    return (
+        settings.admin_token is not None
+        and token is not None
+        and secrets.compare_digest(token.encode(), settings.admin_token.encode())
+    )
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    if settings.admin_token is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+admin_router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@admin_router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(default=5.0, gt=0, le=60),
+    interval_ms: float = Query(default=5.0, ge=1, le=1000),
+) -> PlainTextResponse:
+    """Sample every thread of the process for the given time, including the event
+    loop serving other requests, and return the collapsed stacks."""
+    stacks = await run_in_threadpool(sample_for, seconds, interval_ms / 1000)
+    return PlainTextResponse(render_collapsed(stacks))
+
+
+class ProfileRequestMiddleware:
+    """Profiles a single request when an admin sends it with an X-Profile header.
+
+    The event loop thread is sampled while the request runs, so samples of requests
+    served concurrently are included too. The collapsed stacks replace the response
+    body; the status the app returned is kept in the X-Profiled-Status header.
+    """
+
+    def __init__(self, app: ASGIApp, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if PROFILE_HEADER not in headers or not is_admin(
+            headers.get(ADMIN_TOKEN_HEADER)
+        ):
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def discard_response(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        sampler = StackSampler(self.interval, threading.get_ident()).start()
+        try:
+            await self.app(scope, receive, discard_response)
+        finally:
+            stacks = sampler.stop()
+        response = PlainTextResponse(
+            render_collapsed(stacks), headers={"X-Profiled-Status": str(status)}
+        )
+        await response(scope, receive, send)
@@ -1,23 +1,101 @@
-from fastapi import FastAPI, Request, Response
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from be_task_ca.user.interface.api import user_router
 from be_task_ca.item.interface.api import item_router
 
-from .database import SessionLocal
+from .admin import ProfileRequestMiddleware, admin_router
+from .container import build_use_cases
+from .metrics import Histogram, registry
+from .persistence import MemoryPersistence
+from .settings import settings
+from .shared_memory import SharedMemoryStore
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Durability for the memory backend, enabled by setting a data directory
+    memory_persistence = None
+    if settings.repository == "memory" and settings.memory_data_dir:
+        memory_persistence = MemoryPersistence(
+            settings.memory_data_dir,
+            fsync_interval=settings.memory_fsync_interval_seconds,
+            snapshot_interval=settings.memory_snapshot_interval_seconds,
+        )
+        memory_persistence.open()
+
+    # Each worker maps the shared store and loads its own replica from it
+    shared_store = None
+    if settings.repository == "shared":
+        shared_store = SharedMemoryStore(
+            settings.shared_memory_path, settings.shared_memory_size_mb * 2**20
+        )
+        shared_store.open()
+
+    app.state.use_cases = build_use_cases(settings, shared_store=shared_store)
+    yield
+
+    if memory_persistence is not None:
+        memory_persistence.close()
+    if shared_store is not None:
+        shared_store.close()
+    if settings.repository == "sql":
+        from .database import dispose_async_engine
+
+        await dispose_async_engine()
+
+
+class MetricsMiddleware:
+    """Times every request until its response has been sent completely, including
+    the body of streaming responses, labelled by the route handler that served it."""
+
+    def __init__(self, app: ASGIApp, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = "500"
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched endpoint in the scope; handler names
+            # keep the label set small, unlike raw paths with ids in them
+            endpoint = scope.get("endpoint")
+            handler = endpoint.__name__ if endpoint is not None else "unmatched"
+            self.histogram.observe(
+                (handler, scope["method"], status), time.perf_counter() - start
+            )
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(user_router)
 app.include_router(item_router)
+app.include_router(admin_router)
 
+if settings.admin_token is not None:
+    app.add_middleware(ProfileRequestMiddleware)
 
-@app.middleware("http")
-async def db_session_middleware(request: Request, call_next):
-    response = Response("Internal server error", status_code=500)
-    try:
-        request.state.db = SessionLocal()
-        response = await call_next(request)
-    finally:
-        request.state.db.close()
-    return response
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, histogram=registry.http_requests)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(
+            registry.render(), media_type="text/plain; version=0.0.4"
+        )
 
 
 @app.get("/")
@@ -25,3 +103,17 @@ async def root():
     return {
         "message": "Thanks for shopping at Nile!"
     }  # the Nile is 250km longer than the Amazon
+
+
+@app.get("/health/db-pool")
+async def db_pool():
+    # The memory backends never create an engine, and the SQL backend may have been
+    # given its sessions from elsewhere; neither should build one just to report it
+    if settings.repository != "sql":
+        return {"status": "unused"}
+    from .database import get_async_engine, pool_status
+
+    if not get_async_engine.cache_info().currsize:
+        return {"status": "unused"}
+    # Reads the pool counters only; never checks out a connection
+    return pool_status(get_async_engine())
@@ -1,10 +1,10 @@
-from .database import engine, Base
+from .database import Base, get_engine
 
 # just importing all the models is enough to have them created
 # flake8: noqa
-from .item.models.sql_model import SQLAlchemyItem
+from .item.models.sql_model import SQLAlchemyItem, SQLAlchemyReservation
 from .user.models.sql_model import SQLAlchemyCartItem, SQLAlchemyUser
 
 
 def create_db_schema():
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
@@ -1,5 +0,0 @@
-from fastapi import Request
-
-
-def get_db(request: Request):
-    return request.state.db
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from be_task_ca.cache import TTLCache
+from be_task_ca.metrics import Instrumented, MetricsRegistry, registry
+from be_task_ca.item.repositories.async_cached_repository import (
+    AsyncCachedItemRepository,
+)
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.async_repository import AsyncItemRepository
+from be_task_ca.item.repositories.async_shared_memory_repository import (
+    AsyncSharedMemoryItemRepository,
+)
+from be_task_ca.item.reservations import AsyncStockReservations, SweepSchedule
+from be_task_ca.item.usecases import AsyncItemUseCase
+from be_task_ca.settings import Settings
+from be_task_ca.shared_memory import SharedMemoryStore
+from be_task_ca.user.repositories.async_in_memory_repository import (
+    AsyncInMemoryUserRepository,
+)
+from be_task_ca.user.repositories.async_repository import AsyncUserRepository
+from be_task_ca.user.repositories.async_shared_memory_repository import (
+    AsyncSharedMemoryUserRepository,
+)
+from be_task_ca.user.usecases import AsyncUserUseCase
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+"""
+
+Composition root. The repositories, caches and use cases are built once at startup
+from the settings and shared by every request, so serving a request resolves its
+use case with an attribute lookup instead of constructing a dependency graph.
+
+SQLAlchemy and the SQL repositories are imported only when the SQL backend is
+built, which keeps them out of the startup of the memory backends.
+
+"""
+
+
+@dataclass
+class UseCases:
+    items: AsyncItemUseCase
+    users: AsyncUserUseCase
+
+
+def build_repositories(
+    settings: Settings,
+    session_factory: "async_sessionmaker | None" = None,
+    metrics: MetricsRegistry | None = None,
+    shared_store: SharedMemoryStore | None = None,
+) -> tuple[AsyncItemRepository, AsyncUserRepository]:
+    def timed(repository):
+        if metrics is None:
+            return repository
+        return Instrumented(repository, metrics.repository_calls)
+
+    if settings.repository == "memory":
+        # Without an fsync interval every persisted write waits for its fsync
+        durable_writes = (
+            settings.memory_data_dir is not None
+            and settings.memory_fsync_interval_seconds == 0
+        )
+        return (
+            timed(AsyncInMemoryItemRepository(durable_writes)),
+            timed(AsyncInMemoryUserRepository(durable_writes)),
+        )
+
+    if settings.repository == "shared":
+        if shared_store is None:
+            raise ValueError("The shared backend needs an open SharedMemoryStore")
+        return (
+            timed(AsyncSharedMemoryItemRepository(shared_store)),
+            timed(AsyncSharedMemoryUserRepository(shared_store)),
+        )
+
+    from be_task_ca.database import get_async_session_factory
+    from be_task_ca.item.repositories.async_sql_repository import (
+        AsyncSQLItemRepository,
+    )
+    from be_task_ca.user.repositories.async_sql_repository import (
+        AsyncSQLUserRepository,
+    )
+
+    session_factory = session_factory or get_async_session_factory()
+    pool_wait = metrics.db_pool_wait if metrics is not None else None
+    item_repository = timed(AsyncSQLItemRepository(session_factory, pool_wait))
+    if settings.item_cache_enabled:
+        item_cache = TTLCache(
+            maxsize=settings.item_cache_maxsize, ttl=settings.item_cache_ttl_seconds
+        )
+        # Timing both layers shows what the cache saves
+        item_repository = timed(AsyncCachedItemRepository(item_repository, item_cache))
+    user_repository = AsyncSQLUserRepository(
+        session_factory, cart_loading=settings.user_cart_loading, pool_wait=pool_wait
+    )
+    return item_repository, timed(user_repository)
+
+
+def build_use_cases(
+    settings: Settings,
+    session_factory: "async_sessionmaker | None" = None,
+    shared_store: SharedMemoryStore | None = None,
+) -> UseCases:
+    metrics = registry if settings.metrics_enabled else None
+    item_repository, user_repository = build_repositories(
+        settings, session_factory, metrics, shared_store
+    )
+    stock = AsyncStockReservations(
+        item_repository,
+        ttl=timedelta(seconds=settings.reservation_ttl_seconds),
+        schedule=SweepSchedule(settings.reservation_sweep_interval_seconds),
+    )
+    # Cart writes only invalidate the views cached by the process that made them,
+    # so the cache is left out whenever several processes serve the same carts
+    cart_view_cache = None
+    if settings.repository == "memory" or settings.workers == 1:
+        cart_view_cache = TTLCache(
+            maxsize=settings.cart_view_cache_maxsize,
+            ttl=settings.cart_view_cache_ttl_seconds,
+        )
+    item_use_case = AsyncItemUseCase(item_repository)
+    user_use_case = AsyncUserUseCase(user_repository, stock, cart_view_cache)
+    if metrics is not None:
+        item_use_case = Instrumented(item_use_case, metrics.usecase_calls)
+        user_use_case = Instrumented(user_use_case, metrics.usecase_calls)
+    return UseCases(items=item_use_case, users=user_use_case)
@@ -1,41 +1,30 @@
-from fastapi import APIRouter, Depends
-
-from be_task_ca.item.repositories.repository import ItemRepository
-from sqlalchemy.orm import Session
-from be_task_ca.item.usecases import ItemUseCase
-from be_task_ca.item.repositories.in_memory_repository import (
-    InMemoryItemRepository,
-)  # Default repository
-from be_task_ca.item.repositories.sql_repository import (
-    SQLItemRepository,
-)  # Optional SQL repository
-from .schema import CreateItemRequest, CreateItemResponse, AllItemsResponse
-from be_task_ca.database import get_db
+from typing import AsyncIterator, List
+import orjson
+from fastapi import APIRouter, Body, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from be_task_ca.item.usecases import AsyncItemUseCase
+from .schema import (
+    AllItemsResponse,
+    BulkCreateItemsResponse,
+    CreateItemRequest,
+    CreateItemResponse,
+)
 
 """
 
 The API can run without requiring any external dependencies (e.g., a database).
 Switching back to a SQL-based repository or another implementation is still simple, 
-as the API interacts only with the ItemRepository interface.
+as the API interacts only with the AsyncItemUseCase, whatever repository it was
+built with.
 
 """
 
 
-def get_repository(
-    repo_type: str = "memory", db: Session = Depends(get_db)
-) -> ItemRepository:
-    if repo_type == "memory":
-        return InMemoryItemRepository()
-    elif repo_type == "sql":
-        return SQLItemRepository(db=db)
-    raise ValueError(f"Unknown repository type: {repo_type}")
-
-
-# Dependency to provide an ItemUseCase with the dynamically selected repository
-def get_item_use_case(
-    repository: ItemRepository = Depends(get_repository),
-) -> ItemUseCase:
-    return ItemUseCase(repository)
+# The use case is built once at startup by the composition root in
+# be_task_ca.container. An async dependency runs inline instead of in a thread.
+async def get_item_use_case(request: Request) -> AsyncItemUseCase:
+    return request.app.state.use_cases.items
 
 
 item_router = APIRouter(
@@ -47,11 +36,43 @@ item_router = APIRouter(
 @item_router.post("/", response_model=CreateItemResponse)
 async def post_item(
     item: CreateItemRequest,
-    item_use_case: ItemUseCase = Depends(get_item_use_case),
+    item_use_case: AsyncItemUseCase = Depends(get_item_use_case),
 ) -> CreateItemResponse:
-    return item_use_case.create_item(item)
+    return await item_use_case.create_item(item)
+
+
+@item_router.post("/bulk", response_model=BulkCreateItemsResponse)
+async def post_items_bulk(
+    items: List[CreateItemRequest] = Body(..., min_items=1, max_items=10_000),
+    item_use_case: AsyncItemUseCase = Depends(get_item_use_case),
+) -> BulkCreateItemsResponse:
+    """Create many items in one transaction; rows with taken names are reported."""
+    return await item_use_case.create_items(items)
+
+
+# The listings return their response directly: orjson encodes the domain dataclasses
+# in one pass, skipping the response_model copy and validation, which is kept for
+# the OpenAPI schema only
+@item_router.get("/", response_model=AllItemsResponse, response_class=ORJSONResponse)
+async def get_items(
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    item_use_case: AsyncItemUseCase = Depends(get_item_use_case),
+) -> ORJSONResponse:
+    # Without a limit the whole catalog is returned, as before pagination existed
+    if limit is None:
+        return ORJSONResponse(await item_use_case.get_all_items())
+    return ORJSONResponse(await item_use_case.get_items_page(cursor, limit))
+
+
+async def ndjson_lines(item_use_case: AsyncItemUseCase) -> AsyncIterator[bytes]:
+    async for item in item_use_case.iter_items():
+        yield orjson.dumps(item) + b"\n"
 
 
-@item_router.get("/", response_model=AllItemsResponse)
-async def get_items(item_use_case: ItemUseCase = Depends(get_item_use_case)):
-    return AllItemsResponse(items=item_use_case.get_all_items())
+@item_router.get("/stream")
+async def stream_items(item_use_case: AsyncItemUseCase = Depends(get_item_use_case)):
+    """Stream the whole catalog as newline-delimited JSON, one item per line."""
+    return StreamingResponse(
+        ndjson_lines(item_use_case), media_type="application/x-ndjson"
+    )
@@ -16,3 +16,16 @@ class CreateItemResponse(CreateItemRequest):
 
 class AllItemsResponse(BaseModel):
     items: List[CreateItemResponse]
+    # Pass as the cursor of the next request to continue a paginated listing
+    next_cursor: str | None = None
+
+
+class BulkItemError(BaseModel):
+    index: int  # position of the rejected row in the request
+    name: str
+    detail: str
+
+
+class BulkCreateItemsResponse(BaseModel):
+    created: List[CreateItemResponse]
+    errors: List[BulkItemError]
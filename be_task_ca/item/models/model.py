@@ -1,8 +1,9 @@
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 from uuid import UUID, uuid4
 
 
-@dataclass
+@dataclass(slots=True)
 class Item:
     id: UUID
     name: str
@@ -20,3 +21,27 @@ class Item:
             price=price,
             quantity=quantity,
         )
+
+
+@dataclass(slots=True)
+class Reservation:
+    """Stock of an item held for a user's cart until it expires."""
+
+    id: UUID
+    user_id: UUID
+    item_id: UUID
+    quantity: int
+    expires_at: datetime
+
+    @staticmethod
+    def create(
+        user_id: UUID, item_id: UUID, quantity: int, now: datetime, ttl: timedelta
+    ) -> "Reservation":
+        """Factory method to create a new Reservation expiring ttl after now."""
+        return Reservation(
+            id=uuid4(),
+            user_id=user_id,
+            item_id=item_id,
+            quantity=quantity,
+            expires_at=now + ttl,
+        )
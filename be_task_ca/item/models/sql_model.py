@@ -1,7 +1,10 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID, uuid4
+from sqlalchemy import DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 from be_task_ca.database import Base
-from .model import Item as DomainItem
+from .model import Item as DomainItem, Reservation as DomainReservation
 
 
 class SQLAlchemyItem(Base):
@@ -13,7 +16,7 @@ class SQLAlchemyItem(Base):
         index=True,
     )
     name: Mapped[str] = mapped_column(unique=True, index=True)
-    description: Mapped[str]
+    description: Mapped[Optional[str]]
     price: Mapped[float]
     quantity: Mapped[int]
 
@@ -37,3 +40,35 @@ class SQLAlchemyItem(Base):
             price=domain_item.price,
             quantity=domain_item.quantity,
         )
+
+
+class SQLAlchemyReservation(Base):
+    __tablename__ = "reservations"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    user_id: Mapped[UUID]
+    item_id: Mapped[UUID] = mapped_column(ForeignKey("items.id"))
+    quantity: Mapped[int]
+    # Indexed for the sweep that returns expired reservations to stock
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+    def to_domain(self) -> DomainReservation:
+        """Convert the SQLAlchemyReservation to the universal Reservation model."""
+        return DomainReservation(
+            id=self.id,
+            user_id=self.user_id,
+            item_id=self.item_id,
+            quantity=self.quantity,
+            expires_at=self.expires_at,
+        )
+
+    @staticmethod
+    def from_domain(domain_reservation: DomainReservation) -> "SQLAlchemyReservation":
+        """Convert a universal Reservation model to SQLAlchemyReservation."""
+        return SQLAlchemyReservation(
+            id=domain_reservation.id,
+            user_id=domain_reservation.user_id,
+            item_id=domain_reservation.item_id,
+            quantity=domain_reservation.quantity,
+            expires_at=domain_reservation.expires_at,
+        )
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import AsyncIterator, List
+from uuid import UUID
+from .async_repository import AsyncItemRepository
+from be_task_ca.cache import MISSING, TTLCache
+from be_task_ca.item.models.model import Item, Reservation
+
+"""
+
+Read-through cache in front of any AsyncItemRepository.
+
+Lookups are answered from the cache while the entry is younger than the cache TTL;
+any write through this repository drops every cached entry, since the catalog
+changes rarely compared with how often it is read. Writes made by other processes
+become visible once the TTL has passed. Lookups that find nothing are not cached,
+so a newly created item is never hidden. A lookup that overlapped a write does not
+fill the cache, since it may have read the data from before the write.
+
+"""
+
+
+class AsyncCachedItemRepository(AsyncItemRepository):
+    def __init__(self, repository: AsyncItemRepository, cache: TTLCache):
+        self.repository = repository
+        self.cache = cache
+
+    async def save_item(self, item: Item) -> Item:
+        try:
+            return await self.repository.save_item(item)
+        finally:
+            self.cache.clear()
+
+    async def save_items(self, items: List[Item]) -> List[Item]:
+        try:
+            return await self.repository.save_items(items)
+        finally:
+            self.cache.clear()
+
+    async def get_all_items(self) -> List[Item]:
+        items = self.cache.get(("all",))
+        if items is MISSING:
+            generation = self.cache.generation
+            items = await self.repository.get_all_items()
+            self.cache.set(("all",), items, generation)
+        return items
+
+    async def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        key = ("page", after, limit)
+        items = self.cache.get(key)
+        if items is MISSING:
+            generation = self.cache.generation
+            items = await self.repository.get_items_page(after, limit)
+            self.cache.set(key, items, generation)
+        return items
+
+    def iter_items(self, batch_size: int = 500) -> AsyncIterator[Item]:
+        # Full catalog scans would only flush the hot entries out of the cache
+        return self.repository.iter_items(batch_size)
+
+    async def find_item_by_name(self, name: str) -> Item | None:
+        item = self.cache.get(("name", name))
+        if item is MISSING:
+            generation = self.cache.generation
+            item = await self.repository.find_item_by_name(name)
+            if item is not None:
+                self.cache.set(("name", name), item, generation)
+        return item
+
+    async def find_items_by_names(self, names: List[str]) -> List[Item]:
+        # Used for uniqueness checks before writes, which must see fresh data
+        return await self.repository.find_items_by_names(names)
+
+    async def find_item_by_id(self, id: UUID) -> Item | None:
+        item = self.cache.get(("id", id))
+        if item is MISSING:
+            generation = self.cache.generation
+            item = await self.repository.find_item_by_id(id)
+            if item is not None:
+                self.cache.set(("id", id), item, generation)
+        return item
+
+    async def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        try:
+            return await self.repository.reserve_stock(reservations)
+        finally:
+            self.cache.clear()
+
+    async def release_expired_reservations(self, now: datetime) -> int:
+        try:
+            return await self.repository.release_expired_reservations(now)
+        finally:
+            self.cache.clear()
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any, Callable, List
+from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+from .async_repository import AsyncItemRepository
+from .in_memory_repository import InMemoryItemRepository
+from be_task_ca.item.models.model import Item, Reservation
+
+"""
+
+Async In-Memory Repository
+
+The in-memory operations only work on the dictionaries of this process, so they are
+called directly instead of being pushed to a thread pool. The exception is memory
+persistence with an fsync interval of 0: a write then waits for its fsync while
+holding the repository locks, so durable writes run in the thread pool.
+
+"""
+
+
+class AsyncInMemoryItemRepository(AsyncItemRepository):
+    def __init__(self, durable_writes: bool = False):
+        self.repository = InMemoryItemRepository()
+        self.durable_writes = durable_writes
+
+    async def _write(self, method: Callable[..., Any], *args):
+        if self.durable_writes:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def save_item(self, item: Item) -> Item:
+        return await self._write(self.repository.save_item, item)
+
+    async def save_items(self, items: List[Item]) -> List[Item]:
+        return await self._write(self.repository.save_items, items)
+
+    async def get_all_items(self) -> List[Item]:
+        return self.repository.get_all_items()
+
+    async def find_item_by_name(self, name: str) -> Item | None:
+        return self.repository.find_item_by_name(name)
+
+    async def find_items_by_names(self, names: List[str]) -> List[Item]:
+        return self.repository.find_items_by_names(names)
+
+    async def find_item_by_id(self, id: UUID) -> Item | None:
+        return self.repository.find_item_by_id(id)
+
+    async def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        return self.repository.get_items_page(after, limit)
+
+    async def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        return await self._write(self.repository.reserve_stock, reservations)
+
+    async def release_expired_reservations(self, now: datetime) -> int:
+        return await self._write(self.repository.release_expired_reservations, now)
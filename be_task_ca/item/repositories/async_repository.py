@@ -0,0 +1,69 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, List
+from uuid import UUID
+from be_task_ca.item.models.model import Item, Reservation
+
+"""
+
+Async counterpart of ItemRepository. Implementations must not block the event loop,
+so the API can keep many requests in flight on a single worker.
+
+"""
+
+
+class AsyncItemRepository(ABC):
+    @abstractmethod
+    async def save_item(self, item: Item) -> Item:
+        pass
+
+    @abstractmethod
+    async def save_items(self, items: List[Item]) -> List[Item]:
+        """Insert new items all at once, or none if any name is already taken."""
+        pass
+
+    @abstractmethod
+    async def get_all_items(self) -> List[Item]:
+        pass
+
+    @abstractmethod
+    async def find_item_by_name(self, name: str) -> Item:
+        pass
+
+    @abstractmethod
+    async def find_items_by_names(self, names: List[str]) -> List[Item]:
+        pass
+
+    @abstractmethod
+    async def find_item_by_id(self, id: UUID) -> Item:
+        pass
+
+    @abstractmethod
+    async def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        """Return up to limit items ordered by name, starting after the given name."""
+        pass
+
+    async def iter_items(self, batch_size: int = 500) -> AsyncIterator[Item]:
+        """Yield the whole catalog, fetching it in keyset pages of batch_size."""
+        after = None
+        while True:
+            page = await self.get_items_page(after, batch_size)
+            for item in page:
+                yield item
+            if len(page) < batch_size:
+                return
+            after = page[-1].name
+
+    @abstractmethod
+    async def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        """Take the reserved quantities out of stock and record the reservations.
+
+        Either every reservation is made or none is: raises ItemNotFoundError or
+        InsufficientStockError for the first item that cannot be reserved.
+        """
+        pass
+
+    @abstractmethod
+    async def release_expired_reservations(self, now: datetime) -> int:
+        """Return reservations expired by now to stock; returns how many there were."""
+        pass
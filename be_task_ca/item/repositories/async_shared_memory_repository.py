@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+from .async_repository import AsyncItemRepository
+from .shared_memory_repository import SharedMemoryItemRepository
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.shared_memory import SharedMemoryStore
+
+"""
+
+Async Shared-Memory Repository
+
+Writes wait for the file lock shared with the other workers and may compact the
+log, so they run in the thread pool. Reads are served from the replica on the event
+loop once it is up to date; when other writes were committed since, catching up
+runs in the thread pool first.
+
+"""
+
+
+class AsyncSharedMemoryItemRepository(AsyncItemRepository):
+    def __init__(self, store: SharedMemoryStore):
+        self.store = store
+        self.repository = SharedMemoryItemRepository(store)
+
+    async def _refresh(self):
+        if not self.store.is_current():
+            await run_in_threadpool(self.store.refresh)
+
+    async def save_item(self, item: Item) -> Item:
+        return await run_in_threadpool(self.repository.save_item, item)
+
+    async def save_items(self, items: List[Item]) -> List[Item]:
+        return await run_in_threadpool(self.repository.save_items, items)
+
+    async def get_all_items(self) -> List[Item]:
+        await self._refresh()
+        return self.repository.replica.get_all_items()
+
+    async def find_item_by_name(self, name: str) -> Item | None:
+        await self._refresh()
+        return self.repository.replica.find_item_by_name(name)
+
+    async def find_items_by_names(self, names: List[str]) -> List[Item]:
+        await self._refresh()
+        return self.repository.replica.find_items_by_names(names)
+
+    async def find_item_by_id(self, id: UUID) -> Item | None:
+        await self._refresh()
+        return self.repository.replica.find_item_by_id(id)
+
+    async def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        await self._refresh()
+        return self.repository.replica.get_items_page(after, limit)
+
+    async def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        return await run_in_threadpool(self.repository.reserve_stock, reservations)
+
+    async def release_expired_reservations(self, now: datetime) -> int:
+        return await run_in_threadpool(
+            self.repository.release_expired_reservations, now
+        )
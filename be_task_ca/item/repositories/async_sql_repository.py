@@ -0,0 +1,76 @@
+import time
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from datetime import datetime
+from typing import Callable, List, TypeVar
+from uuid import UUID
+from be_task_ca.metrics import Histogram
+from .async_repository import AsyncItemRepository
+from .sql_repository import SQLItemRepository
+from be_task_ca.item.models.model import Item, Reservation
+
+"""
+
+Async SQL Repository
+
+Each call runs the SQLItemRepository query logic through AsyncSession.run_sync, which
+executes it on the async driver connection: every round-trip to the database is
+awaited on the event loop instead of blocking it.
+
+The repository is long-lived and shared by all requests. Every call opens its own
+short session, which holds a pooled connection only while the call runs. With a
+pool_wait histogram, the time spent checking that connection out is recorded.
+
+"""
+
+T = TypeVar("T")
+
+
+class AsyncSQLItemRepository(AsyncItemRepository):
+    def __init__(
+        self, session_factory: async_sessionmaker, pool_wait: Histogram | None = None
+    ):
+        self.session_factory = session_factory
+        self.pool_wait = pool_wait
+
+    async def _run(self, operation: Callable[[SQLItemRepository], T]) -> T:
+        async with self.session_factory() as db:
+            if self.pool_wait is not None:
+                start = time.perf_counter()
+                await db.connection()
+                self.pool_wait.observe((), time.perf_counter() - start)
+            return await db.run_sync(
+                lambda session: operation(SQLItemRepository(session))
+            )
+
+    async def save_item(self, item: Item) -> Item:
+        return await self._run(lambda repository: repository.save_item(item))
+
+    async def save_items(self, items: List[Item]) -> List[Item]:
+        return await self._run(lambda repository: repository.save_items(items))
+
+    async def get_all_items(self) -> List[Item]:
+        return await self._run(lambda repository: repository.get_all_items())
+
+    async def find_item_by_name(self, name: str) -> Item:
+        return await self._run(lambda repository: repository.find_item_by_name(name))
+
+    async def find_items_by_names(self, names: List[str]) -> List[Item]:
+        return await self._run(lambda repository: repository.find_items_by_names(names))
+
+    async def find_item_by_id(self, id: UUID) -> Item:
+        return await self._run(lambda repository: repository.find_item_by_id(id))
+
+    async def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        return await self._run(
+            lambda repository: repository.get_items_page(after, limit)
+        )
+
+    async def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        return await self._run(
+            lambda repository: repository.reserve_stock(reservations)
+        )
+
+    async def release_expired_reservations(self, now: datetime) -> int:
+        return await self._run(
+            lambda repository: repository.release_expired_reservations(now)
+        )
@@ -1,28 +1,246 @@
-from .repository import ItemRepository
-from be_task_ca.item.models.model import Item
-from typing import List
+import threading
+from dataclasses import replace
+from datetime import datetime
+from heapq import heapify, heappop, heappush
+from itertools import count
+from .repository import (
+    InsufficientStockError,
+    InvalidQuantityError,
+    ItemAlreadyExistsError,
+    ItemNotFoundError,
+    ItemRepository,
+)
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.locking import StripedLock
+from be_task_ca.sorted_keys import SortedKeys
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 from uuid import UUID, uuid4
 
 """ In-Memory Repository """
 
+# A mutation handed to the journal: its kind and the new state of what changed
+JournalRecord = Tuple[str, Union[Item, Reservation]]
+
 
 class InMemoryItemRepository(ItemRepository):
-    _storage = {}  # Shared class-level dictionary for persistence
+    # Shared class-level dictionaries for persistence: the primary store keyed
+    # by id and a unique secondary index mapping each name to its item id.
+    _storage: Dict[UUID, Item] = {}
+    _name_index: Dict[str, UUID] = {}
+    # All names in sorted order, for keyset pagination. It locks itself, for
+    # just the update or the page read.
+    _sorted_names = SortedKeys()
+    # Writers lock the stripes of the item id and of every name they touch;
+    # readers rely on single dict operations being atomic and take no lock.
+    _locks = StripedLock()
+    # Live reservations as a min-heap on expiry, so a sweep only pops the
+    # expired head. The sequence number keeps ties from comparing reservations.
+    _reservations: List[Tuple[datetime, int, Reservation]] = []
+    _reservations_lock = threading.Lock()
+    _reservation_sequence = count()
+    # Expired reservations a sweep has popped but whose stock it has not yet
+    # returned; they still hold that stock, so dumps keep them.
+    _releasing: Dict[UUID, Reservation] = {}
+    # Receives every mutation while its locks are held, when persistence is on
+    _journal: Optional[Callable[[tuple], None]] = None
+
+    @classmethod
+    def clear_storage(cls):
+        cls._storage.clear()
+        cls._name_index.clear()
+        cls._sorted_names.clear()
+        cls._reservations.clear()
+        cls._releasing.clear()
+
+    @classmethod
+    def restore(cls, items: List[Item], reservations: List[Reservation]):
+        """Replace the whole store, rebuilding the indexes from the items.
+
+        Fresh containers are swapped in, the primary store first: items are never
+        deleted, so a reader still holding an old index finds its items.
+        """
+        cls._storage = {item.id: item for item in items}
+        cls._name_index = {item.name: item.id for item in items}
+        cls._sorted_names = SortedKeys(cls._name_index)
+        heap = [
+            (reservation.expires_at, next(cls._reservation_sequence), reservation)
+            for reservation in reservations
+        ]
+        heapify(heap)
+        cls._reservations = heap
+        cls._releasing = {}
+
+    @classmethod
+    def put_reservation(cls, reservation: Reservation):
+        """Track a reservation whose stock was taken by another process."""
+        with cls._reservations_lock:
+            heappush(
+                cls._reservations,
+                (reservation.expires_at, next(cls._reservation_sequence), reservation),
+            )
+
+    @classmethod
+    def discard_reservations(cls, reservation_ids: Set[UUID]):
+        """Stop tracking reservations that another process returned to stock."""
+        with cls._reservations_lock:
+            heap = [
+                entry
+                for entry in cls._reservations
+                if entry[2].id not in reservation_ids
+            ]
+            heapify(heap)
+            cls._reservations = heap
+
+    @classmethod
+    def dump(cls) -> Tuple[List[Item], List[Reservation]]:
+        """A consistent copy of the items and the reservations holding their stock.
+
+        Writers are locked out meanwhile, so no reservation is caught between
+        taking or returning its stock and being added or removed.
+        """
+        with cls._locks.all(), cls._reservations_lock:
+            reservations = [entry[2] for entry in cls._reservations]
+            reservations += cls._releasing.values()
+            return list(cls._storage.values()), reservations
+
+    def _record(self, kind: str, value):
+        if self._journal is not None:
+            self._journal((kind, value))
 
     def save_item(self, item: Item) -> Item:
         if not item.id:  # If the item doesn't have an ID, assign one
             item.id = uuid4()
-        self._storage[item.id] = item
-        return item
 
-    def find_item_by_name(self, name: str) -> Item | None:
-        for item in self._storage.values():
-            if item.name == name:
+        while True:
+            previous = self._storage.get(item.id)
+            previous_name = previous.name if previous is not None else item.name
+            with self._locks(item.id, item.name, previous_name):
+                # Retry if the item was renamed before we got hold of the locks
+                current = self._storage.get(item.id)
+                if (current.name if current else item.name) != previous_name:
+                    continue
+
+                owner_id = self._name_index.get(item.name)
+                if owner_id is not None and owner_id != item.id:
+                    raise ItemAlreadyExistsError(item.name)
+
+                # Drop the index entry of the previous name when an item is renamed
+                if previous_name != item.name:
+                    self._name_index.pop(previous_name, None)
+                    self._sorted_names.discard(previous_name)
+
+                self._storage[item.id] = item
+                self._name_index[item.name] = item.id
+                self._record("item", item)
+                if owner_id is None:
+                    self._sorted_names.add(item.name)
                 return item
-        return None
+
+    def save_items(self, items: List[Item]) -> List[Item]:
+        for item in items:
+            if not item.id:
+                item.id = uuid4()
+        keys = [item.id for item in items] + [item.name for item in items]
+        with self._locks(*keys):
+            seen = set()
+            for item in items:
+                owner_id = self._name_index.get(item.name)
+                if item.name in seen or (owner_id is not None and owner_id != item.id):
+                    raise ItemAlreadyExistsError(item.name)
+                seen.add(item.name)
+
+            new_names = []
+            for item in items:
+                if item.name not in self._name_index:
+                    new_names.append(item.name)
+                self._storage[item.id] = item
+                self._name_index[item.name] = item.id
+            self._sorted_names.update(new_names)
+            self._record("batch", [("item", item) for item in items])
+        return items
+
+    def find_item_by_name(self, name: str) -> Item | None:
+        item_id = self._name_index.get(name)
+        if item_id is None:
+            return None
+        return self._storage.get(item_id)
+
+    def find_items_by_names(self, names: List[str]) -> List[Item]:
+        items = (self.find_item_by_name(name) for name in set(names))
+        return [item for item in items if item is not None]
 
     def find_item_by_id(self, id: UUID) -> Item | None:
         return self._storage.get(id)
 
     def get_all_items(self) -> List[Item]:
         return list(self._storage.values())
+
+    def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        names = self._sorted_names.page(after, limit)
+        # A name can briefly outlive its index entry while an item is renamed
+        item_ids = [self._name_index.get(name) for name in names]
+        return [self._storage[item_id] for item_id in item_ids if item_id is not None]
+
+    def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        with self._locks(*(reservation.item_id for reservation in reservations)):
+            # Check every line before taking anything so a failure changes nothing
+            requested: Dict[UUID, int] = {}
+            for reservation in reservations:
+                item_id = reservation.item_id
+                # A negative quantity would put stock back instead of taking it
+                if reservation.quantity <= 0:
+                    raise InvalidQuantityError(item_id, reservation.quantity)
+                if item_id not in self._storage:
+                    raise ItemNotFoundError(item_id)
+                requested[item_id] = requested.get(item_id, 0) + reservation.quantity
+                if self._storage[item_id].quantity < requested[item_id]:
+                    raise InsufficientStockError(item_id)
+
+            # Stored items are swapped rather than mutated, so lock-free readers
+            # never see a half-applied reservation
+            records: List[JournalRecord] = []
+            for item_id, quantity in requested.items():
+                item = self._storage[item_id]
+                self._storage[item_id] = replace(
+                    item, quantity=item.quantity - quantity
+                )
+                records.append(("item", self._storage[item_id]))
+
+            with self._reservations_lock:
+                for reservation in reservations:
+                    records.append(("reserve", reservation))
+                    heappush(
+                        self._reservations,
+                        (
+                            reservation.expires_at,
+                            next(self._reservation_sequence),
+                            reservation,
+                        ),
+                    )
+            # One record, so the stock taken is never journaled without the
+            # reservations that give it back
+            self._record("batch", records)
+        return reservations
+
+    def release_expired_reservations(self, now: datetime) -> int:
+        expired: List[Reservation] = []
+        with self._reservations_lock:
+            while self._reservations and self._reservations[0][0] <= now:
+                reservation = heappop(self._reservations)[2]
+                self._releasing[reservation.id] = reservation
+                expired.append(reservation)
+
+        for reservation in expired:
+            with self._locks(reservation.item_id):
+                records: List[JournalRecord] = []
+                item = self._storage.get(reservation.item_id)
+                if item is not None:
+                    self._storage[item.id] = replace(
+                        item, quantity=item.quantity + reservation.quantity
+                    )
+                    records.append(("item", self._storage[item.id]))
+                records.append(("release", reservation))
+                self._record("batch", records)
+                with self._reservations_lock:
+                    self._releasing.pop(reservation.id, None)
+        return len(expired)
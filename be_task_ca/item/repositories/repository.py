@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime
+from typing import Iterator, List
 from uuid import UUID
-from be_task_ca.item.models.model import Item
+from be_task_ca.item.models.model import Item, Reservation
 
 """ 
 
@@ -12,11 +13,49 @@ with an in-memory implementation (or any other methodology).
 """
 
 
+class ItemAlreadyExistsError(ValueError):
+    """Raised by save_item when another item already uses the same name."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Item with name {name!r} already exists")
+        self.name = name
+
+
+class ItemNotFoundError(ValueError):
+    """Raised when stock is reserved for an item that does not exist."""
+
+    def __init__(self, item_id: UUID):
+        super().__init__(f"Item {item_id} not found")
+        self.item_id = item_id
+
+
+class InsufficientStockError(ValueError):
+    """Raised when an item has less stock available than requested."""
+
+    def __init__(self, item_id: UUID):
+        super().__init__(f"Not enough stock for item {item_id}")
+        self.item_id = item_id
+
+
+class InvalidQuantityError(ValueError):
+    """Raised when stock is reserved in a quantity that is not positive."""
+
+    def __init__(self, item_id: UUID, quantity: int):
+        super().__init__(f"Cannot reserve {quantity} of item {item_id}")
+        self.item_id = item_id
+        self.quantity = quantity
+
+
 class ItemRepository(ABC):
     @abstractmethod
     def save_item(self, item: Item) -> Item:
         pass
 
+    @abstractmethod
+    def save_items(self, items: List[Item]) -> List[Item]:
+        """Insert new items all at once, or none if any name is already taken."""
+        pass
+
     @abstractmethod
     def get_all_items(self) -> List[Item]:
         pass
@@ -25,6 +64,40 @@ class ItemRepository(ABC):
     def find_item_by_name(self, name: str) -> Item:
         pass
 
+    @abstractmethod
+    def find_items_by_names(self, names: List[str]) -> List[Item]:
+        pass
+
     @abstractmethod
     def find_item_by_id(self, id: UUID) -> Item:
         pass
+
+    @abstractmethod
+    def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        """Return up to limit items ordered by name, starting after the given name."""
+        pass
+
+    def iter_items(self, batch_size: int = 500) -> Iterator[Item]:
+        """Yield the whole catalog, fetching it in keyset pages of batch_size."""
+        after = None
+        while True:
+            page = self.get_items_page(after, batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = page[-1].name
+
+    @abstractmethod
+    def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        """Take the reserved quantities out of stock and record the reservations.
+
+        Either every reservation is made or none is: raises InvalidQuantityError,
+        ItemNotFoundError or InsufficientStockError for the first item that cannot
+        be reserved.
+        """
+        pass
+
+    @abstractmethod
+    def release_expired_reservations(self, now: datetime) -> int:
+        """Return reservations expired by now to stock; returns how many there were."""
+        pass
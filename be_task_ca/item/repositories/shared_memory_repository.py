@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+from .in_memory_repository import InMemoryItemRepository
+from .repository import ItemRepository
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.shared_memory import SharedMemoryStore
+
+"""
+
+Shared-Memory Repository
+
+Serves the in-memory replica of this process, kept in step with the other worker
+processes through the shared store. Reads run at in-memory speed; writes serialize
+across processes on the store's lock.
+
+"""
+
+
+class SharedMemoryItemRepository(ItemRepository):
+    def __init__(self, store: SharedMemoryStore):
+        self.store = store
+        self.replica = InMemoryItemRepository()
+
+    def save_item(self, item: Item) -> Item:
+        with self.store.write():
+            return self.replica.save_item(item)
+
+    def save_items(self, items: List[Item]) -> List[Item]:
+        with self.store.write():
+            return self.replica.save_items(items)
+
+    def get_all_items(self) -> List[Item]:
+        self.store.refresh()
+        return self.replica.get_all_items()
+
+    def find_item_by_name(self, name: str) -> Item | None:
+        self.store.refresh()
+        return self.replica.find_item_by_name(name)
+
+    def find_items_by_names(self, names: List[str]) -> List[Item]:
+        self.store.refresh()
+        return self.replica.find_items_by_names(names)
+
+    def find_item_by_id(self, id: UUID) -> Item | None:
+        self.store.refresh()
+        return self.replica.find_item_by_id(id)
+
+    def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        self.store.refresh()
+        return self.replica.get_items_page(after, limit)
+
+    def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        with self.store.write():
+            return self.replica.reserve_stock(reservations)
+
+    def release_expired_reservations(self, now: datetime) -> int:
+        with self.store.write():
+            return self.replica.release_expired_reservations(now)
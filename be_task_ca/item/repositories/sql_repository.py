@@ -1,26 +1,184 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
-from .repository import ItemRepository
-from be_task_ca.item.models.model import Item
+from .repository import (
+    InsufficientStockError,
+    InvalidQuantityError,
+    ItemAlreadyExistsError,
+    ItemNotFoundError,
+    ItemRepository,
+)
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.models.sql_model import SQLAlchemyItem, SQLAlchemyReservation
 
-""" SQL Repository """
+"""
+
+SQL Repository
+
+Reads select plain columns, in the field order of the Item dataclass, and build domain
+items straight from the row tuples. This skips ORM identity-map bookkeeping, which
+the read-heavy catalog paths do not need.
+
+"""
+
+ITEM_COLUMNS = (
+    SQLAlchemyItem.id,
+    SQLAlchemyItem.name,
+    SQLAlchemyItem.description,
+    SQLAlchemyItem.price,
+    SQLAlchemyItem.quantity,
+)
+
+
+def item_values(item: Item) -> dict:
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "price": item.price,
+        "quantity": item.quantity,
+    }
 
 
 class SQLItemRepository(ItemRepository):
     def __init__(self, db: Session):
         self.db = db
 
+    def _fetch(self, query) -> List[Item]:
+        return [Item(*row) for row in self.db.execute(query)]
+
     def save_item(self, item: Item) -> Item:
-        self.db.add(item)
-        self.db.commit()
+        values = item_values(item)
+        try:
+            self.db.execute(insert(SQLAlchemyItem).values(values))
+            self.db.commit()
+            return item
+        except IntegrityError:
+            self.db.rollback()
+
+        # Either the item exists and is being updated, or its name is taken
+        try:
+            result = self.db.execute(
+                update(SQLAlchemyItem)
+                .where(SQLAlchemyItem.id == item.id)
+                .values(values)
+            )
+            if result.rowcount == 0:
+                raise ItemAlreadyExistsError(item.name)
+            self.db.commit()
+        except (IntegrityError, ItemAlreadyExistsError):
+            self.db.rollback()
+            raise ItemAlreadyExistsError(item.name)
         return item
 
+    def save_items(self, items: List[Item]) -> List[Item]:
+        if not items:
+            return items
+        # One executemany, which SQLAlchemy sends as multi-row INSERT statements,
+        # committed as a single transaction
+        try:
+            self.db.execute(
+                insert(SQLAlchemyItem), [item_values(item) for item in items]
+            )
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            taken = self.find_items_by_names([item.name for item in items])
+            if not taken:
+                raise
+            raise ItemAlreadyExistsError(taken[0].name)
+        return items
+
     def get_all_items(self) -> List[Item]:
-        return self.db.query(Item).all()
+        return self._fetch(select(*ITEM_COLUMNS))
+
+    def find_item_by_name(self, name: str) -> Item | None:
+        items = self._fetch(select(*ITEM_COLUMNS).where(SQLAlchemyItem.name == name))
+        return items[0] if items else None
+
+    def find_items_by_names(self, names: List[str]) -> List[Item]:
+        if not names:
+            return []
+        return self._fetch(select(*ITEM_COLUMNS).where(SQLAlchemyItem.name.in_(names)))
+
+    def find_item_by_id(self, id: UUID) -> Item | None:
+        items = self._fetch(select(*ITEM_COLUMNS).where(SQLAlchemyItem.id == id))
+        return items[0] if items else None
+
+    def get_items_page(self, after: str | None, limit: int) -> List[Item]:
+        # Keyset pagination: seek past the last seen name on the unique name index
+        query = select(*ITEM_COLUMNS).order_by(SQLAlchemyItem.name).limit(limit)
+        if after is not None:
+            query = query.where(SQLAlchemyItem.name > after)
+        return self._fetch(query)
 
-    def find_item_by_name(self, name: str) -> Item:
-        return self.db.query(Item).filter(Item.name == name).first()
+    def reserve_stock(self, reservations: List[Reservation]) -> List[Reservation]:
+        if not reservations:
+            return reservations
+        requested = Counter()
+        for reservation in reservations:
+            # A negative quantity would put stock back instead of taking it
+            if reservation.quantity <= 0:
+                raise InvalidQuantityError(reservation.item_id, reservation.quantity)
+            requested[reservation.item_id] += reservation.quantity
 
-    def find_item_by_id(self, id: UUID) -> Item:
-        return self.db.query(Item).filter(Item.id == id).first()
+        # A conditional decrement per item: the row lock it takes serialises
+        # concurrent reservations, and the WHERE clause refuses to oversell.
+        # Items are visited in id order so concurrent batches cannot deadlock.
+        for item_id in sorted(requested):
+            result = self.db.execute(
+                update(SQLAlchemyItem)
+                .where(
+                    SQLAlchemyItem.id == item_id,
+                    SQLAlchemyItem.quantity >= requested[item_id],
+                )
+                .values(quantity=SQLAlchemyItem.quantity - requested[item_id])
+            )
+            if result.rowcount == 0:
+                self.db.rollback()
+                exists = self.db.scalar(
+                    select(SQLAlchemyItem.id).where(SQLAlchemyItem.id == item_id)
+                )
+                if exists is None:
+                    raise ItemNotFoundError(item_id)
+                raise InsufficientStockError(item_id)
+
+        self.db.execute(
+            insert(SQLAlchemyReservation),
+            [
+                {
+                    "id": reservation.id,
+                    "user_id": reservation.user_id,
+                    "item_id": reservation.item_id,
+                    "quantity": reservation.quantity,
+                    "expires_at": reservation.expires_at,
+                }
+                for reservation in reservations
+            ],
+        )
+        self.db.commit()
+        return reservations
+
+    def release_expired_reservations(self, now: datetime) -> int:
+        # Deleting with RETURNING claims each expired reservation exactly once,
+        # even when several workers sweep at the same time
+        expired = self.db.execute(
+            delete(SQLAlchemyReservation)
+            .where(SQLAlchemyReservation.expires_at <= now)
+            .returning(SQLAlchemyReservation.item_id, SQLAlchemyReservation.quantity)
+        ).all()
+        released = Counter()
+        for item_id, quantity in expired:
+            released[item_id] += quantity
+        for item_id in sorted(released):
+            self.db.execute(
+                update(SQLAlchemyItem)
+                .where(SQLAlchemyItem.id == item_id)
+                .values(quantity=SQLAlchemyItem.quantity + released[item_id])
+            )
+        self.db.commit()
+        return len(expired)
@@ -0,0 +1,76 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+from uuid import UUID
+
+from be_task_ca.item.models.model import Reservation
+from be_task_ca.item.repositories.async_repository import AsyncItemRepository
+
+"""
+
+Stock reservations
+
+Adding a line to a cart takes its quantity out of the item's stock for a limited time.
+Expired reservations go back to stock lazily: a reserve call sweeps them first, at
+most once per sweep interval, so there is no background task to run or supervise.
+
+"""
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SweepSchedule:
+    """Tells callers when the next sweep of expired reservations is due."""
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        # Only the caller that moves the schedule forward runs the sweep
+        with self._lock:
+            now = self.clock()
+            if now < self._next_sweep:
+                return False
+            self._next_sweep = now + self.interval
+            return True
+
+
+def new_reservations(
+    user_id: UUID, quantities: Dict[UUID, int], now: datetime, ttl: timedelta
+) -> List[Reservation]:
+    return [
+        Reservation.create(user_id, item_id, quantity, now, ttl)
+        for item_id, quantity in quantities.items()
+    ]
+
+
+class AsyncStockReservations:
+    def __init__(
+        self,
+        repository: AsyncItemRepository,
+        ttl: timedelta,
+        schedule: SweepSchedule,
+        now: Callable[[], datetime] = utc_now,
+    ):
+        self.repository = repository
+        self.ttl = ttl
+        self.schedule = schedule
+        self.now = now
+
+    async def reserve(
+        self, user_id: UUID, quantities: Dict[UUID, int]
+    ) -> List[Reservation]:
+        """Reserve the quantity of every item, or raise without reserving any."""
+        if self.schedule.due():
+            await self.release_expired()
+        reservations = new_reservations(user_id, quantities, self.now(), self.ttl)
+        return await self.repository.reserve_stock(reservations)
+
+    async def release_expired(self) -> int:
+        return await self.repository.release_expired_reservations(self.now())
@@ -1,47 +1,116 @@
+from typing import AsyncIterator
 from fastapi import HTTPException
 from uuid import uuid4  # Import UUID generator
-from .repositories.repository import ItemRepository
+from .repositories.repository import ItemAlreadyExistsError
+from .repositories.async_repository import AsyncItemRepository
 from .models.model import Item
-from be_task_ca.item.interface.schema import CreateItemRequest, CreateItemResponse
+from be_task_ca.item.interface.schema import (
+    BulkCreateItemsResponse,
+    BulkItemError,
+    CreateItemRequest,
+    CreateItemResponse,
+)
 
 
-class ItemUseCase:
-    def __init__(self, repository: ItemRepository):
+def item_already_exists() -> HTTPException:
+    return HTTPException(status_code=400, detail="Item with this name already exists")
+
+
+def new_item_from_request(item: CreateItemRequest) -> Item:
+    return Item(
+        id=uuid4(),
+        name=item.name,
+        description=item.description,
+        price=item.price,
+        quantity=item.quantity,
+    )
+
+
+def item_to_response(item: Item) -> CreateItemResponse:
+    return CreateItemResponse(
+        id=item.id,
+        name=item.name,
+        description=item.description,
+        price=item.price,
+        quantity=item.quantity,
+    )
+
+
+def items_page_response(items: list[Item], limit: int | None = None) -> dict:
+    """The AllItemsResponse body, holding the domain items for direct encoding."""
+    # A full page means there may be more items after the last name
+    next_cursor = items[-1].name if items and len(items) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def plan_bulk_import(
+    items: list[CreateItemRequest], taken_names: set[str]
+) -> tuple[list[Item], list[BulkItemError]]:
+    """Split a bulk import into the items to insert and per-row errors."""
+    new_items, errors, seen = [], [], set()
+    for index, item in enumerate(items):
+        if item.name in taken_names:
+            detail = "Item with this name already exists"
+        elif item.name in seen:
+            detail = "Duplicate name within the batch"
+        else:
+            seen.add(item.name)
+            new_items.append(new_item_from_request(item))
+            continue
+        errors.append(BulkItemError(index=index, name=item.name, detail=detail))
+    return new_items, errors
+
+
+def bulk_import_response(
+    new_items: list[Item], errors: list[BulkItemError]
+) -> BulkCreateItemsResponse:
+    return BulkCreateItemsResponse(
+        created=[item_to_response(item) for item in new_items], errors=errors
+    )
+
+
+class AsyncItemUseCase:
+    def __init__(self, repository: AsyncItemRepository):
         self.repository = repository
 
-    def create_item(self, item: CreateItemRequest) -> CreateItemResponse:
+    async def create_item(self, item: CreateItemRequest) -> CreateItemResponse:
         # Check if the item already exists by name
-        similar_item = self.repository.find_item_by_name(item.name)
+        similar_item = await self.repository.find_item_by_name(item.name)
         if similar_item:
-            raise HTTPException(
-                status_code=400, detail="Item with this name already exists"
-            )
-
-        new_item = Item(
-            id=uuid4(),
-            name=item.name,
-            description=item.description,
-            price=item.price,
-            quantity=item.quantity,
-        )
-        self.repository.save_item(new_item)
-        return CreateItemResponse(
-            id=new_item.id,
-            name=new_item.name,
-            description=new_item.description,
-            price=new_item.price,
-            quantity=new_item.quantity,
-        )
-
-    def get_all_items(self) -> list[CreateItemResponse]:
-        items = self.repository.get_all_items()
-        return [
-            CreateItemResponse(
-                id=item.id,
-                name=item.name,
-                description=item.description,
-                price=item.price,
-                quantity=item.quantity,
-            )
-            for item in items
-        ]
+            raise item_already_exists()
+
+        new_item = new_item_from_request(item)
+        try:
+            await self.repository.save_item(new_item)
+        except ItemAlreadyExistsError:
+            # Lost a race against a concurrent create with the same name
+            raise item_already_exists()
+        return item_to_response(new_item)
+
+    async def create_items(
+        self, items: list[CreateItemRequest]
+    ) -> BulkCreateItemsResponse:
+        # One set-based lookup for every name in the batch
+        names = list({item.name for item in items})
+        existing = await self.repository.find_items_by_names(names)
+        taken_names = {item.name for item in existing}
+        while True:
+            new_items, errors = plan_bulk_import(items, taken_names)
+            try:
+                await self.repository.save_items(new_items)
+                return bulk_import_response(new_items, errors)
+            except ItemAlreadyExistsError as error:
+                # A concurrent create took one of the names; report and retry
+                taken_names.add(error.name)
+
+    async def get_all_items(self) -> dict:
+        # Domain items go straight to the JSON encoder, without response models
+        return items_page_response(await self.repository.get_all_items())
+
+    async def get_items_page(self, cursor: str | None, limit: int) -> dict:
+        items = await self.repository.get_items_page(cursor, limit)
+        return items_page_response(items, limit)
+
+    async def iter_items(self) -> AsyncIterator[Item]:
+        async for item in self.repository.iter_items():
+            yield item
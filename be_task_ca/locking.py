@@ -0,0 +1,45 @@
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterator
+
+"""
+
+Lock striping for the in-memory repositories.
+
+Instead of one global lock, every key is mapped onto one of a fixed number of locks.
+Writers touching different keys almost always take different locks and proceed in
+parallel, while writers touching the same key are serialized. Locks for several keys
+are always taken in stripe order, so multi-key writers cannot deadlock each other.
+
+"""
+
+
+class StripedLock:
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def stripe_for(self, key: Hashable) -> int:
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def __call__(self, *keys: Hashable) -> Iterator[None]:
+        """Hold the locks guarding all given keys for the duration of the block."""
+        stripes = sorted({self.stripe_for(key) for key in keys})
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
+
+    @contextmanager
+    def all(self) -> Iterator[None]:
+        """Hold every stripe, which waits for and then excludes every writer."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
@@ -0,0 +1,375 @@
+import os
+import pickle
+import struct
+import threading
+import zlib
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from uuid import UUID
+
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.user.models.model import CartItem, User
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+
+"""
+
+Optional durability for the in-memory repositories.
+
+Every mutation is appended to a write-ahead log while the writer still holds its
+stripe locks, so the log has the same order per key as the in-memory state. Records
+carry the full new state of what changed (an item, a user, a cart line, a
+reservation), which makes replaying them idempotent. A write that changes several
+things journals them as one batch record, which a crash keeps or loses whole.
+Appends are group committed: one fsync covers every record appended since the
+previous one.
+
+A snapshot periodically writes the whole state in one compact binary file and lets
+the log segments before it be deleted. Startup maps the snapshot into memory and
+replays only the segments written since.
+
+"""
+
+FRAME_HEADER = struct.Struct("<II")  # payload length, CRC-32 of the payload
+SNAPSHOT_MAGIC = b"BTCASNP1"
+SNAPSHOT_FILE = "snapshot.bin"
+SEGMENT_SUFFIX = ".wal"
+
+
+def segment_path(directory: Path, segment: int) -> Path:
+    return directory / f"{segment:010d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(directory: Path) -> List[int]:
+    return sorted(int(path.stem) for path in directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_frames(path: Path) -> Iterator[bytes]:
+    """Yield the payloads of a log segment, stopping at a torn or corrupt tail."""
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset + FRAME_HEADER.size <= len(data):
+        length, checksum = FRAME_HEADER.unpack_from(data, offset)
+        start = offset + FRAME_HEADER.size
+        end = start + length
+        payload = data[start:end]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return  # the process died halfway through this write
+        yield payload
+        offset = end
+
+
+def fsync_directory(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    """Append-only log split into numbered segments, with group-committed fsyncs.
+
+    With an fsync interval of 0 an append returns once its record is on disk; writers
+    arriving while an fsync is running are committed together by the next one. With
+    a positive interval appends return immediately and a background thread commits
+    them, so a crash loses at most the last interval of writes.
+    """
+
+    def __init__(self, directory: Path, segment: int, fsync_interval: float):
+        self.directory = directory
+        self.segment = segment
+        self.fsync_interval = fsync_interval
+        self._file = open(segment_path(directory, segment), "ab")
+        self._pending: List[bytes] = []
+        self._appended = 0  # sequence number of the last appended record
+        self._durable = 0  # sequence number of the last record on disk
+        self._committing = False
+        self._closed = threading.Event()
+        self._condition = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+        if fsync_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, daemon=True
+            )
+            self._flusher.start()
+
+    def append(self, payload: bytes):
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._condition:
+            self._pending.append(frame)
+            self._appended += 1
+            if self._flusher is None:
+                self._commit_until(self._appended)
+
+    def _commit_until(self, sequence: int):
+        # Called with the condition held. The first waiter becomes the leader and
+        # writes out everything pending; the others wait for its fsync.
+        while self._durable < sequence:
+            if self._committing:
+                self._condition.wait()
+                continue
+            self._committing = True
+            frames, self._pending = self._pending, []
+            upto = self._appended
+            self._condition.release()
+            try:
+                self._file.write(b"".join(frames))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            finally:
+                self._condition.acquire()
+                self._committing = False
+                self._condition.notify_all()
+            self._durable = upto
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.fsync_interval):
+            self.flush()
+
+    def flush(self):
+        with self._condition:
+            self._commit_until(self._appended)
+
+    def rotate(self) -> int:
+        """Commit what is pending and continue in a new segment; returns its number."""
+        with self._condition:
+            self._commit_until(self._appended)
+            self._file.close()
+            self.segment += 1
+            self._file = open(segment_path(self.directory, self.segment), "ab")
+            fsync_directory(self.directory)
+            return self.segment
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._condition:
+            self._commit_until(self._appended)
+            self._file.close()
+
+
+def encode(record: tuple) -> tuple:
+    """Flatten a journal record of domain objects into a tuple of primitives."""
+    kind, value = record
+    if kind == "item":
+        return (
+            kind,
+            value.id.bytes,
+            value.name,
+            value.description,
+            value.price,
+            value.quantity,
+        )
+    if kind == "user":
+        return (
+            kind,
+            value.id.bytes,
+            value.email,
+            value.first_name,
+            value.last_name,
+            value.hashed_password,
+            value.shipping_address,
+        )
+    if kind == "cart":
+        return (kind, value.user_id.bytes, value.item_id.bytes, value.quantity)
+    if kind == "reserve":
+        return (
+            kind,
+            value.id.bytes,
+            value.user_id.bytes,
+            value.item_id.bytes,
+            value.quantity,
+            value.expires_at,
+        )
+    if kind == "release":
+        return (kind, value.id.bytes)
+    if kind == "batch":
+        return (kind, tuple(encode(nested) for nested in value))
+    raise ValueError(f"Unknown journal record: {kind}")
+
+
+def decode_item(fields: tuple) -> Item:
+    id, name, description, price, quantity = fields
+    return Item(UUID(bytes=id), name, description, price, quantity)
+
+
+def decode_user(fields: tuple) -> User:
+    id, email, first_name, last_name, hashed_password, shipping_address = fields
+    return User(
+        UUID(bytes=id), email, first_name, last_name, hashed_password, shipping_address
+    )
+
+
+def decode_cart_item(fields: tuple) -> CartItem:
+    user_id, item_id, quantity = fields
+    return CartItem(UUID(bytes=user_id), UUID(bytes=item_id), quantity)
+
+
+def decode_reservation(fields: tuple) -> Reservation:
+    id, user_id, item_id, quantity, expires_at = fields
+    return Reservation(
+        UUID(bytes=id), UUID(bytes=user_id), UUID(bytes=item_id), quantity, expires_at
+    )
+
+
+def unbatch(records: Iterable[tuple]) -> Iterator[tuple]:
+    """The encoded records with every batch replaced by the records it holds."""
+    for record in records:
+        if record[0] == "batch":
+            yield from unbatch(record[1])
+        else:
+            yield record
+
+
+class MemoryState:
+    """The contents of both in-memory repositories, keyed for idempotent replay."""
+
+    def __init__(self):
+        self.items: dict[UUID, Item] = {}
+        self.users: dict[UUID, User] = {}
+        self.cart_items: dict[tuple[UUID, UUID], CartItem] = {}
+        self.reservations: dict[UUID, Reservation] = {}
+
+    def apply(self, record: tuple):
+        kind, fields = record[0], record[1:]
+        if kind == "batch":
+            for nested in unbatch(fields[0]):
+                self.apply(nested)
+        elif kind == "item":
+            item = decode_item(fields)
+            self.items[item.id] = item
+        elif kind == "user":
+            user = decode_user(fields)
+            self.users[user.id] = user
+        elif kind == "cart":
+            cart_item = decode_cart_item(fields)
+            self.cart_items[cart_item.user_id, cart_item.item_id] = cart_item
+        elif kind == "reserve":
+            reservation = decode_reservation(fields)
+            self.reservations[reservation.id] = reservation
+        elif kind == "release":
+            self.reservations.pop(UUID(bytes=fields[0]), None)
+
+
+def restore_state(state: MemoryState):
+    """Replace the contents of both in-memory repositories with state."""
+    carts: dict[UUID, List[CartItem]] = {}
+    for cart_item in state.cart_items.values():
+        carts.setdefault(cart_item.user_id, []).append(cart_item)
+    InMemoryItemRepository.restore(
+        list(state.items.values()), list(state.reservations.values())
+    )
+    InMemoryUserRepository.restore(list(state.users.values()), carts)
+
+
+def dump_records() -> Iterator[tuple]:
+    """The contents of both in-memory repositories as encoded records."""
+    items, reservations = InMemoryItemRepository.dump()
+    users, cart_items = InMemoryUserRepository.dump()
+    for item in items:
+        yield encode(("item", item))
+    for user in users:
+        yield encode(("user", user))
+    for cart_item in cart_items:
+        yield encode(("cart", cart_item))
+    for reservation in reservations:
+        yield encode(("reserve", reservation))
+
+
+def write_snapshot(directory: Path, segment: int, records: List[tuple]):
+    """Atomically replace the snapshot with records, valid from segment onwards."""
+    path = directory / SNAPSHOT_FILE
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as file:
+        file.write(SNAPSHOT_MAGIC)
+        pickle.dump((segment, records), file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    fsync_directory(directory)
+
+
+def read_snapshot(directory: Path) -> tuple[int, List[tuple]]:
+    """Return the first segment to replay and the snapshot records, if any."""
+    path = directory / SNAPSHOT_FILE
+    if not path.exists() or path.stat().st_size == 0:
+        return 0, []
+    # Unpickling straight from the mapping avoids reading the file into a copy first
+    with open(path, "rb") as file, mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+        if data.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        return pickle.load(data)
+
+
+class MemoryPersistence:
+    """Recovers the in-memory repositories at startup and journals their writes."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fsync_interval: float = 0.01,
+        snapshot_interval: float = 300,
+    ):
+        self.directory = Path(directory)
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.log: Optional[WriteAheadLog] = None
+        self._snapshot_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._snapshotter: Optional[threading.Thread] = None
+
+    def open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        first_segment, records = read_snapshot(self.directory)
+        state = MemoryState()
+        for record in records:
+            state.apply(record)
+        segments = [n for n in list_segments(self.directory) if n >= first_segment]
+        for segment in segments:
+            for payload in read_frames(segment_path(self.directory, segment)):
+                state.apply(pickle.loads(payload))
+        restore_state(state)
+
+        # Never append after a possibly torn tail: start a fresh segment
+        next_segment = max(segments, default=first_segment - 1) + 1
+        self.log = WriteAheadLog(self.directory, next_segment, self.fsync_interval)
+        InMemoryItemRepository._journal = self._append
+        InMemoryUserRepository._journal = self._append
+
+        if self.snapshot_interval > 0:
+            self._snapshotter = threading.Thread(
+                target=self._snapshot_periodically, daemon=True
+            )
+            self._snapshotter.start()
+
+    def _append(self, record: tuple):
+        self.log.append(pickle.dumps(encode(record), protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _snapshot_periodically(self):
+        while not self._stopped.wait(self.snapshot_interval):
+            self.snapshot()
+
+    def snapshot(self):
+        """Write the current state and drop the log segments it makes redundant."""
+        with self._snapshot_lock:
+            # Writes racing with the dump land in the new segment as well; replaying
+            # them over the snapshot is harmless since records are idempotent
+            segment = self.log.rotate()
+            write_snapshot(self.directory, segment, list(dump_records()))
+            for old_segment in list_segments(self.directory):
+                if old_segment < segment:
+                    segment_path(self.directory, old_segment).unlink()
+
+    def close(self):
+        """Stop journaling and leave a fresh snapshot for a fast next startup."""
+        self._stopped.set()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        self.snapshot()
+        InMemoryItemRepository._journal = None
+        InMemoryUserRepository._journal = None
+        self.log.close()
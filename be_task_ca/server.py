@@ -0,0 +1,79 @@
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+
+from .settings import Settings, settings
+
+"""
+
+Production entry point: `poetry run serve`.
+
+Gunicorn supervises the worker processes, restarts crashed ones and drains
+in-flight requests on SIGTERM for up to the graceful timeout. Each worker runs
+uvicorn, which picks uvloop and httptools automatically when they are installed
+(`poetry install --extras speedups`). The app is imported once in the master before
+forking, so import errors stop the launch early and workers share its memory.
+
+The in-memory repositories hold the data of one process only, so the memory backend
+runs a single worker; asking for more is refused rather than silently splitting the
+data between workers. The shared backend keeps one dataset for every worker on the
+host and scales like SQL.
+
+"""
+
+
+def available_cores() -> int:
+    # Respects CPU affinity masks such as those set by container runtimes
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count(settings: Settings) -> int:
+    """The number of worker processes to run, validated against the backend."""
+    if settings.workers is None:
+        return 1 if settings.repository == "memory" else available_cores()
+    if settings.workers < 1:
+        raise ValueError("BE_TASK_CA_WORKERS must be at least 1")
+    if settings.repository == "memory" and settings.workers > 1:
+        raise ValueError(
+            "The memory backend keeps its data inside one process and cannot run "
+            f"{settings.workers} workers; use BE_TASK_CA_REPOSITORY=shared, sql or "
+            "a single worker"
+        )
+    return settings.workers
+
+
+def gunicorn_options(settings: Settings) -> dict:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": worker_count(settings),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.graceful_timeout_seconds,
+        "keepalive": 5,
+    }
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from .app import app
+
+        return app
+
+
+def main():
+    try:
+        options = gunicorn_options(settings)
+    except ValueError as error:
+        sys.exit(str(error))
+    Server(options).run()
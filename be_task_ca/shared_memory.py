@@ -0,0 +1,365 @@
+import fcntl
+import os
+import stat
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from mmap import mmap
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.persistence import (
+    FRAME_HEADER,
+    MemoryState,
+    decode_cart_item,
+    decode_item,
+    decode_reservation,
+    decode_user,
+    dump_records,
+    encode,
+    restore_state,
+    unbatch,
+)
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+
+"""
+
+One dataset for every worker process on a host.
+
+The in-memory repositories of each process act as a replica of a log kept in a
+memory-mapped file, normally under /dev/shm. Writers take an exclusive file lock
+that spans processes, bring their replica up to date, apply the write to it through
+the regular in-memory code (which does the validation) and append the journal
+records of the write to the log. Readers only compare the committed end of the log
+with the position their replica has reached, one unlocked read of the header, and
+replay the records they are missing before serving from their dictionaries.
+
+When the log fills up, the writer holding the lock rewrites it as a compact dump of
+its replica. The header's generation is odd while that happens, seqlock style:
+readers copy what they need, check that the generation did not change meanwhile and
+retry if it did, and a replica that sees a new generation reloads from scratch.
+
+The file holds emails and password hashes under a predictable path in a directory
+every user can write to. It is created readable by its owner only, and an existing
+file is refused unless it is a regular file owned by this user with that mode.
+Records are written in a small tagged binary format of the primitives that encode()
+produces, never pickled, so whatever is in the file cannot run code when decoded.
+
+"""
+
+HEADER = struct.Struct("<QQ")  # generation, committed end of the log
+LENGTH = struct.Struct("<I")
+INT64 = struct.Struct("<q")
+FLOAT64 = struct.Struct("<d")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class SharedStoreFullError(Exception):
+    """Raised when even a compacted log does not fit in the shared memory file."""
+
+
+def pack_record(record: tuple) -> bytes:
+    """Serialize an encoded record: nested tuples of None, int, float, str, bytes
+    and datetimes."""
+    parts: List[bytes] = []
+    pack_value(record, parts)
+    return b"".join(parts)
+
+
+def pack_value(value: Any, parts: List[bytes]):
+    if value is None:
+        parts.append(b"N")
+    elif isinstance(value, bool):
+        parts.append(b"T" if value else b"F")
+    elif isinstance(value, int):
+        parts += [b"i", INT64.pack(value)]
+    elif isinstance(value, float):
+        parts += [b"d", FLOAT64.pack(value)]
+    elif isinstance(value, str):
+        data = value.encode()
+        parts += [b"s", LENGTH.pack(len(data)), data]
+    elif isinstance(value, bytes):
+        parts += [b"b", LENGTH.pack(len(value)), value]
+    elif isinstance(value, datetime):
+        # Aware datetimes as UTC, naive ones as they are
+        if value.tzinfo is None:
+            tag, delta = b"n", value - EPOCH.replace(tzinfo=None)
+        else:
+            tag, delta = b"t", value - EPOCH
+        parts += [tag, INT64.pack(delta // timedelta(microseconds=1))]
+    elif isinstance(value, tuple):
+        parts += [b"(", LENGTH.pack(len(value))]
+        for element in value:
+            pack_value(element, parts)
+    else:
+        raise TypeError(f"Cannot store {type(value).__name__} in the shared log")
+
+
+def unpack_record(payload: bytes) -> tuple:
+    """Deserialize a record written by pack_record; raises ValueError if malformed."""
+    try:
+        record, offset = unpack_value(payload, 0)
+    except (struct.error, UnicodeDecodeError, OverflowError, RecursionError) as error:
+        raise ValueError(f"Malformed shared log record: {error}") from error
+    if offset != len(payload) or not isinstance(record, tuple):
+        raise ValueError("Malformed shared log record")
+    return record
+
+
+def unpack_value(data: bytes, offset: int) -> Tuple[Any, int]:
+    start, offset = offset, offset + 1
+    tag = data[start:offset]
+    if tag == b"N":
+        return None, offset
+    if tag in (b"T", b"F"):
+        return tag == b"T", offset
+    if tag == b"i":
+        return INT64.unpack_from(data, offset)[0], offset + INT64.size
+    if tag == b"d":
+        return FLOAT64.unpack_from(data, offset)[0], offset + FLOAT64.size
+    if tag in (b"s", b"b"):
+        (length,) = LENGTH.unpack_from(data, offset)
+        start = offset + LENGTH.size
+        end = start + length
+        value = data[start:end]
+        if len(value) < length:
+            raise ValueError("Malformed shared log record: truncated value")
+        return (value.decode() if tag == b"s" else bytes(value)), end
+    if tag in (b"t", b"n"):
+        (microseconds,) = INT64.unpack_from(data, offset)
+        epoch = EPOCH if tag == b"t" else EPOCH.replace(tzinfo=None)
+        return epoch + timedelta(microseconds=microseconds), offset + INT64.size
+    if tag == b"(":
+        (count,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        elements = []
+        for _ in range(count):
+            element, offset = unpack_value(data, offset)
+            elements.append(element)
+        return tuple(elements), offset
+    raise ValueError(f"Malformed shared log record: unknown tag {tag!r}")
+
+
+def open_private_file(path: Path) -> int:
+    """Open path for reading and writing, creating it readable by its owner only.
+
+    An existing file is only used if it is a regular file of this user that nobody
+    else can access, so another user cannot plant or read the shared log.
+    """
+    try:
+        return os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    fd = os.open(path, os.O_RDWR | os.O_NOFOLLOW)
+    status = os.fstat(fd)
+    if (
+        not stat.S_ISREG(status.st_mode)
+        or status.st_uid != os.getuid()
+        or status.st_mode & 0o077
+    ):
+        os.close(fd)
+        raise PermissionError(
+            f"{path} must be a regular file owned by this user with mode 0600"
+        )
+    return fd
+
+
+def parse_frames(data: bytes) -> Optional[List[bytes]]:
+    """Split committed log data into payloads, or None if any of them is corrupt."""
+    payloads = []
+    offset = 0
+    while offset < len(data):
+        length, checksum = FRAME_HEADER.unpack_from(data, offset)
+        start = offset + FRAME_HEADER.size
+        end = start + length
+        payload = data[start:end]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return None
+        payloads.append(payload)
+        offset = end
+    return payloads
+
+
+def frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def replay(records: List[tuple]):
+    """Apply records written by other processes to the in-memory repositories."""
+    items = InMemoryItemRepository()
+    users = InMemoryUserRepository()
+    released: Set[UUID] = set()
+    for record in unbatch(records):
+        kind, fields = record[0], record[1:]
+        if kind == "item":
+            items.save_item(decode_item(fields))
+        elif kind == "user":
+            users.save_user(decode_user(fields))
+        elif kind == "cart":
+            InMemoryUserRepository.put_cart_item(decode_cart_item(fields))
+        elif kind == "reserve":
+            InMemoryItemRepository.put_reservation(decode_reservation(fields))
+        elif kind == "release":
+            released.add(UUID(bytes=fields[0]))
+    # One pass over the reservation heap for the whole batch
+    if released:
+        InMemoryItemRepository.discard_reservations(released)
+
+
+class SharedMemoryStore:
+    """The shared log, and the position this process's replica has reached in it."""
+
+    def __init__(self, path: str | Path, size: int):
+        self.path = Path(path)
+        self.size = size
+        self._file = None
+        self._map: Optional[mmap] = None
+        # Guards the replica within this process; the file lock only excludes
+        # other processes, since it is shared by every thread of this one
+        self._lock = threading.RLock()
+        self._generation: Optional[int] = None
+        self._position = HEADER.size
+        self._pending: List[bytes] = []
+        self._replaying = False
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(open_private_file(self.path), "r+b")
+        with self._exclusive():
+            # Only ever grow the file: other workers may have mapped it already
+            if os.fstat(self._file.fileno()).st_size < self.size:
+                os.ftruncate(self._file.fileno(), self.size)
+            self._map = mmap(self._file.fileno(), 0)
+            if self._header()[1] == 0:
+                HEADER.pack_into(self._map, 0, 0, HEADER.size)
+            self._refresh_locked(exclusive=True)
+        InMemoryItemRepository._journal = self._record
+        InMemoryUserRepository._journal = self._record
+
+    def close(self):
+        InMemoryItemRepository._journal = None
+        InMemoryUserRepository._journal = None
+        self._map.close()
+        self._file.close()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _header(self) -> tuple[int, int]:
+        return HEADER.unpack_from(self._map, 0)
+
+    def _record(self, record: tuple):
+        if not self._replaying:
+            self._pending.append(pack_record(encode(record)))
+
+    def is_current(self) -> bool:
+        """Whether the replica has replayed everything committed to the log.
+
+        One unlocked read of the header, cheap enough to check on the event loop.
+        """
+        return self._header() == (self._generation, self._position)
+
+    def refresh(self):
+        """Bring the replica up to date before a read.
+
+        Catching up waits for the writes of this process and for compactions and may
+        reload the whole replica, so async readers run it in the thread pool.
+        """
+        if self.is_current():
+            return
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self, exclusive: bool = False):
+        while True:
+            generation, end = self._header()
+            if generation % 2:
+                # A compaction is running, or its process died halfway through
+                self._recover_compaction(exclusive)
+                continue
+            reload = generation != self._generation
+            start = HEADER.size if reload else self._position
+            data = self._map[start:end]
+            # Retry if a compaction rewrote the log while it was being copied. A
+            # reload also needs the end it read to be the final one of the rewrite.
+            current_generation, current_end = self._header()
+            if current_generation != generation or (reload and current_end != end):
+                continue
+            payloads = parse_frames(data)
+            if payloads is not None:
+                break
+
+        records = [unpack_record(payload) for payload in payloads]
+        self._replaying = True
+        try:
+            if reload:
+                state = MemoryState()
+                for record in records:
+                    state.apply(record)
+                restore_state(state)
+            else:
+                replay(records)
+        finally:
+            self._replaying = False
+        self._generation, self._position = generation, end
+
+    def _recover_compaction(self, exclusive: bool):
+        # Waiting for the file lock waits for the compaction to finish. If the
+        # generation is still odd once we hold it, the compacting process died and
+        # the log is rebuilt from this replica; writes it had not seen are lost.
+        if exclusive:
+            self._compact()
+            return
+        with self._exclusive():
+            if self._header()[0] % 2:
+                self._compact()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Run a write against an up-to-date replica and publish its records."""
+        with self._lock, self._exclusive():
+            self._refresh_locked(exclusive=True)
+            self._pending = []
+            try:
+                yield
+                if self._pending:
+                    self._append(b"".join(frame(p) for p in self._pending))
+            finally:
+                self._pending = []
+
+    def _append(self, frames: bytes):
+        generation, start = self._header()
+        end = start + len(frames)
+        if end > len(self._map):
+            # The replica already holds this write, so its dump includes it
+            self._compact()
+            return
+        self._map[start:end] = frames
+        HEADER.pack_into(self._map, 0, generation, end)
+        self._position = end
+
+    def _compact(self):
+        frames = b"".join(frame(pack_record(record)) for record in dump_records())
+        start = HEADER.size
+        end = start + len(frames)
+        if end > len(self._map):
+            # Drop the unpublished write by reloading the replica from the log
+            self._generation = None
+            raise SharedStoreFullError(
+                f"{self.path} needs more than {len(self._map)} bytes; raise "
+                "BE_TASK_CA_SHARED_MEMORY_SIZE_MB"
+            )
+        generation = self._header()[0] | 1
+        HEADER.pack_into(self._map, 0, generation, HEADER.size)
+        self._map[start:end] = frames
+        HEADER.pack_into(self._map, 0, generation + 1, end)
+        self._generation, self._position = generation + 1, end
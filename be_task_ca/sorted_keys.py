@@ -0,0 +1,110 @@
+import threading
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from typing import Iterable, Iterator, List
+
+"""
+
+A sorted set of strings for keyset pagination over the in-memory repositories.
+
+The keys are kept in sorted chunks of at most twice the load factor, with the
+largest key of every chunk in a separate list, like a two-level B-tree. Finding the
+chunk of a key is a bisection over the chunk maxima and the chunk itself is small,
+so adding or removing a key costs O(log n + load) instead of moving every key after
+it, as a single sorted list does.
+
+"""
+
+
+class SortedKeys:
+    def __init__(self, keys: Iterable[str] = (), load: int = 512):
+        self._load = load
+        self._lock = threading.Lock()
+        self._chunks: List[List[str]] = []
+        self._maxes: List[str] = []
+        self._rebuild(sorted(set(keys)))
+
+    def _rebuild(self, keys: List[str]):
+        self._chunks = []
+        for start in range(0, len(keys), self._load):
+            end = start + self._load
+            self._chunks.append(keys[start:end])
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [key for chunk in self._chunks for key in chunk]
+        return iter(keys)
+
+    def clear(self):
+        with self._lock:
+            self._chunks, self._maxes = [], []
+
+    def add(self, key: str):
+        with self._lock:
+            if not self._maxes:
+                self._chunks, self._maxes = [[key]], [key]
+                return
+            # Keys above every maximum go to the last chunk
+            index = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+            chunk = self._chunks[index]
+            position = bisect_left(chunk, key)
+            if position < len(chunk) and chunk[position] == key:
+                return
+            chunk.insert(position, key)
+            self._maxes[index] = chunk[-1]
+            if len(chunk) > 2 * self._load:
+                load, after = self._load, index + 1
+                halves = [chunk[:load], chunk[load:]]
+                self._chunks[index:after] = halves
+                self._maxes[index:after] = [half[-1] for half in halves]
+
+    def discard(self, key: str):
+        with self._lock:
+            index = bisect_left(self._maxes, key)
+            if index == len(self._maxes):
+                return
+            chunk = self._chunks[index]
+            position = bisect_left(chunk, key)
+            if chunk[position] != key:
+                return
+            del chunk[position]
+            if chunk:
+                self._maxes[index] = chunk[-1]
+            else:
+                del self._chunks[index]
+                del self._maxes[index]
+
+    def update(self, keys: Iterable[str]):
+        keys = sorted(set(keys))
+        if len(keys) <= self._load:
+            for key in keys:
+                self.add(key)
+            return
+        # A large batch is cheaper to merge in one linear pass
+        with self._lock:
+            existing = [key for chunk in self._chunks for key in chunk]
+            merged: List[str] = []
+            for key in merge(existing, keys):
+                if not merged or merged[-1] != key:
+                    merged.append(key)
+            self._rebuild(merged)
+
+    def page(self, after: str | None, limit: int) -> List[str]:
+        """The first limit keys greater than after, or from the start without it."""
+        with self._lock:
+            index, position = 0, 0
+            if after is not None:
+                index = bisect_right(self._maxes, after)
+                if index < len(self._chunks):
+                    position = bisect_right(self._chunks[index], after)
+            keys: List[str] = []
+            while index < len(self._chunks) and len(keys) < limit:
+                chunk = self._chunks[index]
+                end = position + limit - len(keys)
+                keys.extend(chunk[position:end])
+                index, position = index + 1, 0
+            return keys
@@ -1,46 +1,30 @@
-from fastapi import APIRouter, Depends
+from typing import List
+from fastapi import APIRouter, Body, Depends, Request
+from fastapi.responses import ORJSONResponse
 from uuid import UUID
 
-from be_task_ca.user.repositories.repository import UserRepository
-from sqlalchemy.orm import Session
-from be_task_ca.user.usecases import UserUseCase
-from be_task_ca.user.repositories.in_memory_repository import (
-    InMemoryUserRepository,
-)  # Default repository
-from be_task_ca.user.repositories.sql_repository import (
-    SQLUserRepository,
-)  # Optional SQL repository
+from be_task_ca.user.usecases import AsyncUserUseCase
 from be_task_ca.user.interface.schema import (
     CreateUserRequest,
     CreateUserResponse,
     AddToCartRequest,
+    CartViewResponse,
 )
-from be_task_ca.database import get_db
 
 """
 
 The API can run without requiring any external dependencies (e.g., a database).
 Switching back to a SQL-based repository or another implementation is still simple, 
-as the API interacts only with the UserRepository interface.
+as the API interacts only with the AsyncUserUseCase, whatever repository it was
+built with.
 
 """
 
 
-def get_repository(
-    repo_type: str = "memory", db: Session = Depends(get_db)
-) -> UserRepository:
-    if repo_type == "memory":
-        return InMemoryUserRepository()
-    elif repo_type == "sql":
-        return SQLUserRepository(db=db)
-    raise ValueError(f"Unknown repository type: {repo_type}")
-
-
-# Dependency to provide an UserUseCase with the dynamically selected repository
-def get_user_use_case(
-    repository: UserRepository = Depends(get_repository),
-) -> UserUseCase:
-    return UserUseCase(repository)
+# The use case is built once at startup by the composition root in
+# be_task_ca.container. An async dependency runs inline instead of in a thread.
+async def get_user_use_case(request: Request) -> AsyncUserUseCase:
+    return request.app.state.use_cases.users
 
 
 user_router = APIRouter(
@@ -52,29 +36,49 @@ user_router = APIRouter(
 @user_router.post("/", response_model=CreateUserResponse)
 async def post_user(
     user: CreateUserRequest,
-    user_use_case: UserUseCase = Depends(get_user_use_case),
+    user_use_case: AsyncUserUseCase = Depends(get_user_use_case),
 ) -> CreateUserResponse:
-    return user_use_case.create_user(user)
+    return await user_use_case.create_user(user)
 
 
-@user_router.get("/{user_id}", response_model=CreateUserResponse)
+@user_router.get(
+    "/{user_id}", response_model=CreateUserResponse, response_class=ORJSONResponse
+)
 async def get_user(
-    user_id: UUID, user_use_case: UserUseCase = Depends(get_user_use_case)
-) -> CreateUserResponse:
-    return user_use_case.find_user_by_id(user_id)
+    user_id: UUID, user_use_case: AsyncUserUseCase = Depends(get_user_use_case)
+) -> ORJSONResponse:
+    # Encoded directly; response_model only documents the body
+    return ORJSONResponse(await user_use_case.find_user_by_id(user_id))
 
 
 @user_router.post("/{user_id}/cart")
 async def post_cart(
     user_id: UUID,
     cart_item: AddToCartRequest,
-    user_use_case: UserUseCase = Depends(get_user_use_case),
+    user_use_case: AsyncUserUseCase = Depends(get_user_use_case),
+):
+    return await user_use_case.add_item_to_cart(user_id, cart_item)
+
+
+@user_router.post("/{user_id}/cart/batch")
+async def post_cart_batch(
+    user_id: UUID,
+    cart_items: List[AddToCartRequest] = Body(..., min_items=1, max_items=1000),
+    user_use_case: AsyncUserUseCase = Depends(get_user_use_case),
 ):
-    return user_use_case.add_item_to_cart(user_id, cart_item)
+    return await user_use_case.add_items_to_cart(user_id, cart_items)
 
 
 @user_router.get("/{user_id}/cart")
 async def get_cart(
-    user_id: UUID, user_use_case: UserUseCase = Depends(get_user_use_case)
+    user_id: UUID, user_use_case: AsyncUserUseCase = Depends(get_user_use_case)
 ):
-    return user_use_case.list_items_in_cart(user_id)
+    return await user_use_case.list_items_in_cart(user_id)
+
+
+@user_router.get("/{user_id}/cart/view", response_model=CartViewResponse)
+async def get_cart_view(
+    user_id: UUID, user_use_case: AsyncUserUseCase = Depends(get_user_use_case)
+) -> CartViewResponse:
+    """The cart with item names, prices, line totals and the grand total."""
+    return await user_use_case.get_cart_view(user_id)
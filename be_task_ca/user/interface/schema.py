@@ -36,9 +36,22 @@ class CreateUserResponse(BaseModel):
 
 class AddToCartRequest(BaseModel):
     item_id: UUID
-    quantity: int
+    quantity: int = Field(gt=0)
 
 
 class CartItemResponse(BaseModel):
     item_id: UUID
     quantity: int
+
+
+class CartLineResponse(BaseModel):
+    item_id: UUID
+    name: Optional[str]
+    unit_price: Optional[float]
+    quantity: int
+    line_total: float
+
+
+class CartViewResponse(BaseModel):
+    lines: List[CartLineResponse]
+    total: float
@@ -3,7 +3,7 @@ from typing import List, Optional
 from uuid import UUID, uuid4
 
 
-@dataclass
+@dataclass(slots=True)
 class CartItem:
     user_id: UUID
     item_id: UUID
@@ -19,7 +19,7 @@ class CartItem:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: UUID
     email: str
@@ -46,3 +46,35 @@ class User:
             hashed_password=hashed_password,
             shipping_address=shipping_address,
         )
+
+
+@dataclass(slots=True)
+class CartLine:
+    """A cart line joined with the name and price of its item."""
+
+    item_id: UUID
+    quantity: int
+    name: Optional[str] = None  # None when the item is not in the catalog
+    unit_price: Optional[float] = None
+
+    @property
+    def line_total(self) -> float:
+        return (self.unit_price or 0.0) * self.quantity
+
+
+@dataclass(slots=True)
+class CartView:
+    """Read model of a cart with its line totals and grand total precomputed."""
+
+    user_id: UUID
+    lines: List[CartLine]
+    total: float
+
+    @staticmethod
+    def create(user_id: UUID, lines: List[CartLine]) -> "CartView":
+        """Factory method computing the grand total once for the whole cart."""
+        return CartView(
+            user_id=user_id,
+            lines=lines,
+            total=sum(line.line_total for line in lines),
+        )
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID, uuid4
 
 from sqlalchemy import ForeignKey
@@ -45,9 +46,10 @@ class SQLAlchemyUser(Base):
     first_name: Mapped[str]
     last_name: Mapped[str]
     hashed_password: Mapped[str]
-    shipping_address: Mapped[str] = mapped_column(default=None)
+    shipping_address: Mapped[Optional[str]] = mapped_column(default=None)
+    # Never lazy-load carts one user at a time; queries choose an eager strategy
     cart_items: Mapped[list["SQLAlchemyCartItem"]] = relationship(
-        "SQLAlchemyCartItem", backref="user"
+        "SQLAlchemyCartItem", backref="user", lazy="raise_on_sql"
     )
 
     def to_domain(self) -> DomainUser:
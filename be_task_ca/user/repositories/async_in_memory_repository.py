@@ -0,0 +1,52 @@
+from typing import Any, Callable, List
+from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+from .async_repository import AsyncUserRepository
+from .in_memory_repository import InMemoryUserRepository
+from be_task_ca.user.models.model import User, CartItem, CartLine
+
+"""
+
+Async In-Memory Repository
+
+The in-memory operations only work on the dictionaries of this process, so they are
+called directly instead of being pushed to a thread pool. The exception is memory
+persistence with an fsync interval of 0: a write then waits for its fsync while
+holding the repository locks, so durable writes run in the thread pool.
+
+"""
+
+
+class AsyncInMemoryUserRepository(AsyncUserRepository):
+    def __init__(self, durable_writes: bool = False):
+        self.repository = InMemoryUserRepository()
+        self.durable_writes = durable_writes
+
+    async def _write(self, method: Callable[..., Any], *args):
+        if self.durable_writes:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def save_user(self, user: User) -> User:
+        return await self._write(self.repository.save_user, user)
+
+    async def get_all_users(self) -> List[User]:
+        return self.repository.get_all_users()
+
+    async def find_user_by_email(self, email: str) -> User | None:
+        return self.repository.find_user_by_email(email)
+
+    async def find_user_by_id(self, id: UUID) -> User | None:
+        return self.repository.find_user_by_id(id)
+
+    async def add_cart_item(self, cart_item: CartItem):
+        return await self._write(self.repository.add_cart_item, cart_item)
+
+    async def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        return await self._write(self.repository.add_cart_items, user_id, cart_items)
+
+    async def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
+        return self.repository.find_cart_items_for_user_id(user_id)
+
+    async def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        return self.repository.find_cart_lines_for_user_id(user_id)
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import List
+from uuid import UUID
+from be_task_ca.user.models.model import User, CartItem, CartLine
+
+"""
+
+Async counterpart of UserRepository. Implementations must not block the event loop,
+so the API can keep many requests in flight on a single worker.
+
+"""
+
+
+class AsyncUserRepository(ABC):
+    @abstractmethod
+    async def save_user(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    async def get_all_users(self) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def find_user_by_email(self, email: str) -> User:
+        pass
+
+    @abstractmethod
+    async def find_user_by_id(self, id: UUID) -> User:
+        pass
+
+    @abstractmethod
+    async def add_cart_item(self, cart_item: CartItem):
+        """Add a line to a cart, adding up quantities if the item is already in it."""
+        pass
+
+    @abstractmethod
+    async def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        """Merge many lines into the cart of one user in a single write."""
+        pass
+
+    @abstractmethod
+    async def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
+        pass
+
+    @abstractmethod
+    async def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        """Return the cart lines joined with item name and price in one read."""
+        pass
@@ -0,0 +1,57 @@
+from typing import List
+from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+from .async_repository import AsyncUserRepository
+from .shared_memory_repository import SharedMemoryUserRepository
+from be_task_ca.shared_memory import SharedMemoryStore
+from be_task_ca.user.models.model import User, CartItem, CartLine
+
+"""
+
+Async Shared-Memory Repository
+
+Writes wait for the file lock shared with the other workers and may compact the
+log, so they run in the thread pool. Reads are served from the replica on the event
+loop once it is up to date; when other writes were committed since, catching up
+runs in the thread pool first.
+
+"""
+
+
+class AsyncSharedMemoryUserRepository(AsyncUserRepository):
+    def __init__(self, store: SharedMemoryStore):
+        self.store = store
+        self.repository = SharedMemoryUserRepository(store)
+
+    async def _refresh(self):
+        if not self.store.is_current():
+            await run_in_threadpool(self.store.refresh)
+
+    async def save_user(self, user: User) -> User:
+        return await run_in_threadpool(self.repository.save_user, user)
+
+    async def get_all_users(self) -> List[User]:
+        await self._refresh()
+        return self.repository.replica.get_all_users()
+
+    async def find_user_by_email(self, email: str) -> User | None:
+        await self._refresh()
+        return self.repository.replica.find_user_by_email(email)
+
+    async def find_user_by_id(self, id: UUID) -> User | None:
+        await self._refresh()
+        return self.repository.replica.find_user_by_id(id)
+
+    async def add_cart_item(self, cart_item: CartItem):
+        await self.add_cart_items(cart_item.user_id, [cart_item])
+
+    async def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        await run_in_threadpool(self.repository.add_cart_items, user_id, cart_items)
+
+    async def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
+        await self._refresh()
+        return self.repository.replica.find_cart_items_for_user_id(user_id)
+
+    async def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        await self._refresh()
+        return self.repository.replica.find_cart_lines_for_user_id(user_id)
@@ -0,0 +1,78 @@
+import time
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from typing import Callable, List, TypeVar
+from uuid import UUID
+from be_task_ca.metrics import Histogram
+from .async_repository import AsyncUserRepository
+from .sql_repository import CartLoading, SQLUserRepository
+from be_task_ca.user.models.model import User, CartItem, CartLine
+
+"""
+
+Async SQL Repository
+
+Each call runs the SQLUserRepository query logic through AsyncSession.run_sync, which
+executes it on the async driver connection: every round-trip to the database is
+awaited on the event loop instead of blocking it.
+
+The repository is long-lived and shared by all requests. Every call opens its own
+short session, which holds a pooled connection only while the call runs. With a
+pool_wait histogram, the time spent checking that connection out is recorded.
+
+"""
+
+T = TypeVar("T")
+
+
+class AsyncSQLUserRepository(AsyncUserRepository):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        cart_loading: CartLoading = "grouped",
+        pool_wait: Histogram | None = None,
+    ):
+        self.session_factory = session_factory
+        self.cart_loading = cart_loading
+        self.pool_wait = pool_wait
+
+    async def _run(self, operation: Callable[[SQLUserRepository], T]) -> T:
+        async with self.session_factory() as db:
+            if self.pool_wait is not None:
+                start = time.perf_counter()
+                await db.connection()
+                self.pool_wait.observe((), time.perf_counter() - start)
+            return await db.run_sync(
+                lambda session: operation(
+                    SQLUserRepository(session, cart_loading=self.cart_loading)
+                )
+            )
+
+    async def save_user(self, user: User) -> User:
+        return await self._run(lambda repository: repository.save_user(user))
+
+    async def get_all_users(self) -> List[User]:
+        return await self._run(lambda repository: repository.get_all_users())
+
+    async def find_user_by_email(self, email: str) -> User:
+        return await self._run(lambda repository: repository.find_user_by_email(email))
+
+    async def find_user_by_id(self, id: UUID) -> User:
+        return await self._run(lambda repository: repository.find_user_by_id(id))
+
+    async def add_cart_item(self, cart_item: CartItem):
+        return await self._run(lambda repository: repository.add_cart_item(cart_item))
+
+    async def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        return await self._run(
+            lambda repository: repository.add_cart_items(user_id, cart_items)
+        )
+
+    async def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
+        return await self._run(
+            lambda repository: repository.find_cart_items_for_user_id(user_id)
+        )
+
+    async def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        return await self._run(
+            lambda repository: repository.find_cart_lines_for_user_id(user_id)
+        )
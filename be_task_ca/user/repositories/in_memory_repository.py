@@ -1,58 +1,167 @@
-from .repository import UserRepository
-from be_task_ca.user.models.model import User, CartItem
-from typing import List, Dict
+from .repository import UserRepository, UserAlreadyExistsError
+from be_task_ca.user.models.model import User, CartItem, CartLine
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.locking import StripedLock
+from typing import Callable, Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 """ In-Memory Repository """
 
 
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
 class InMemoryUserRepository(UserRepository):
     _users: Dict[UUID, User] = {}
-    _cart_items: Dict[UUID, List[CartItem]] = {}
+    # Unique secondary index from the normalized email to the user id
+    _email_index: Dict[str, UUID] = {}
+    # Carts are kept per user and keyed by item id so lines merge in O(1). A
+    # line is stored as its bare quantity; CartItem objects are only built on
+    # reads, which saves an object per line.
+    _cart_items: Dict[UUID, Dict[UUID, int]] = {}
+    # Every cart line of an item shares one UUID object for its key, instead of
+    # holding the copy parsed from its own request
+    _item_ids: Dict[UUID, UUID] = {}
+    # Writers lock the stripes of the keys they touch (user id, email, cart
+    # owner); readers rely on single dict operations being atomic.
+    _locks = StripedLock()
+    # Receives every mutation while its locks are held, when persistence is on
+    _journal: Optional[Callable[[tuple], None]] = None
 
     @classmethod
     def clear_storage(cls):
         cls._users.clear()
+        cls._email_index.clear()
         cls._cart_items.clear()
+        cls._item_ids.clear()
+
+    @classmethod
+    def restore(cls, users: List[User], carts: Dict[UUID, List[CartItem]]):
+        """Replace the whole store, rebuilding the email index from the users.
+
+        Fresh containers are swapped in, the users first, so a reader still holding
+        the old email index finds its users.
+        """
+        item_ids: Dict[UUID, UUID] = {}
+        cart_items = {
+            user_id: {
+                item_ids.setdefault(cart_item.item_id, cart_item.item_id): (
+                    cart_item.quantity
+                )
+                for cart_item in user_cart_items
+            }
+            for user_id, user_cart_items in carts.items()
+        }
+        cls._users = {user.id: user for user in users}
+        cls._email_index = {normalize_email(user.email): user.id for user in users}
+        cls._item_ids = item_ids
+        cls._cart_items = cart_items
+
+    @classmethod
+    def put_cart_item(cls, cart_item: CartItem):
+        """Set a cart line to the quantity another process gave it."""
+        with cls._locks(cart_item.user_id):
+            item_id = cls._item_ids.setdefault(cart_item.item_id, cart_item.item_id)
+            cart = cls._cart_items.setdefault(cart_item.user_id, {})
+            cart[item_id] = cart_item.quantity
+
+    @classmethod
+    def dump(cls) -> Tuple[List[User], List[CartItem]]:
+        cart_items = [
+            CartItem(user_id, item_id, quantity)
+            for user_id, cart in list(cls._cart_items.items())
+            for item_id, quantity in list(cart.items())
+        ]
+        return list(cls._users.values()), cart_items
+
+    def _record(self, kind: str, value):
+        if self._journal is not None:
+            self._journal((kind, value))
 
     def save_user(self, user: User) -> User:
         if not user.id:  # Assign an ID if missing
             user.id = uuid4()
-        self._users[user.id] = user
-        return user
+
+        email_key = normalize_email(user.email)
+        while True:
+            previous = self._users.get(user.id)
+            previous_key = (
+                normalize_email(previous.email) if previous is not None else email_key
+            )
+            with self._locks(user.id, email_key, previous_key):
+                # Retry if the email changed before we got hold of the locks
+                current = self._users.get(user.id)
+                if (
+                    normalize_email(current.email) if current else email_key
+                ) != previous_key:
+                    continue
+
+                owner_id = self._email_index.get(email_key)
+                if owner_id is not None and owner_id != user.id:
+                    raise UserAlreadyExistsError(user.email)
+
+                # Drop the index entry of the previous email when it changes
+                if previous_key != email_key:
+                    self._email_index.pop(previous_key, None)
+
+                self._users[user.id] = user
+                self._email_index[email_key] = user.id
+                self._record("user", user)
+                return user
 
     def find_user_by_id(self, user_id: UUID) -> User | None:
         return self._users.get(user_id)
 
     def find_user_by_email(self, email: str) -> User | None:
-        for user in self._users.values():
-            if user.email == email:
-                return user
-        return None
+        user_id = self._email_index.get(normalize_email(email))
+        if user_id is None:
+            return None
+        return self._users.get(user_id)
 
     def get_all_users(self) -> List[User]:
         return list(self._users.values())
 
     def add_cart_item(self, cart_item: CartItem):
-        if cart_item.user_id not in self._users:
+        self.add_cart_items(cart_item.user_id, [cart_item])
+
+    def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        user = self._users.get(user_id)
+        if user is None:
             raise ValueError("User not found")
 
-        if cart_item.user_id not in self._cart_items:
-            self._cart_items[cart_item.user_id] = []
-
-        # Add or update cart item
-        existing_item = next(
-            (
-                item
-                for item in self._cart_items[cart_item.user_id]
-                if item.item_id == cart_item.item_id
-            ),
-            None,
-        )
-        if existing_item:
-            existing_item.quantity += cart_item.quantity
-        else:
-            self._cart_items[cart_item.user_id].append(cart_item)
+        # The quantity merge is a read-modify-write, so it runs under the
+        # lock of the cart owner
+        with self._locks(user_id):
+            cart = self._cart_items.setdefault(user.id, {})
+            records = []
+            for cart_item in cart_items:
+                item_id = self._item_ids.setdefault(
+                    cart_item.item_id, cart_item.item_id
+                )
+                cart[item_id] = cart.get(item_id, 0) + cart_item.quantity
+                records.append(("cart", CartItem(user_id, item_id, cart[item_id])))
+            self._record("batch", records)
 
     def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
-        return self._cart_items.get(user_id, [])
+        cart = self._cart_items.get(user_id, {})
+        return [
+            CartItem(user_id, item_id, quantity)
+            for item_id, quantity in list(cart.items())
+        ]
+
+    def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        # One dict probe into the in-memory catalog per line
+        catalog = InMemoryItemRepository()
+        lines = []
+        for cart_item in self.find_cart_items_for_user_id(user_id):
+            item = catalog.find_item_by_id(cart_item.item_id)
+            lines.append(
+                CartLine(
+                    item_id=cart_item.item_id,
+                    quantity=cart_item.quantity,
+                    name=item.name if item else None,
+                    unit_price=item.price if item else None,
+                )
+            )
+        return lines
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 from uuid import UUID
-from be_task_ca.user.models.model import User
+from be_task_ca.user.models.model import User, CartItem, CartLine
 
 """ 
 
@@ -12,6 +12,14 @@ with an in-memory implementation (or any other methodology).
 """
 
 
+class UserAlreadyExistsError(ValueError):
+    """Raised by save_user when another user already uses the same email."""
+
+    def __init__(self, email: str):
+        super().__init__(f"User with email {email!r} already exists")
+        self.email = email
+
+
 class UserRepository(ABC):
     @abstractmethod
     def save_user(self, user: User) -> User:
@@ -29,6 +37,21 @@ class UserRepository(ABC):
     def find_user_by_id(self, id: UUID) -> User:
         pass
 
+    @abstractmethod
+    def add_cart_item(self, cart_item: CartItem):
+        """Add a line to a cart, adding up quantities if the item is already in it."""
+        pass
+
+    @abstractmethod
+    def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        """Merge many lines into the cart of one user in a single write."""
+        pass
+
     @abstractmethod
     def find_cart_items_for_user_id(user_id, db):
         pass
+
+    @abstractmethod
+    def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        """Return the cart lines joined with item name and price in one read."""
+        pass
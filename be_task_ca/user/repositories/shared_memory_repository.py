@@ -0,0 +1,53 @@
+from typing import List
+from uuid import UUID
+from .in_memory_repository import InMemoryUserRepository
+from .repository import UserRepository
+from be_task_ca.shared_memory import SharedMemoryStore
+from be_task_ca.user.models.model import User, CartItem, CartLine
+
+"""
+
+Shared-Memory Repository
+
+Serves the in-memory replica of this process, kept in step with the other worker
+processes through the shared store. Reads run at in-memory speed; writes serialize
+across processes on the store's lock.
+
+"""
+
+
+class SharedMemoryUserRepository(UserRepository):
+    def __init__(self, store: SharedMemoryStore):
+        self.store = store
+        self.replica = InMemoryUserRepository()
+
+    def save_user(self, user: User) -> User:
+        with self.store.write():
+            return self.replica.save_user(user)
+
+    def get_all_users(self) -> List[User]:
+        self.store.refresh()
+        return self.replica.get_all_users()
+
+    def find_user_by_email(self, email: str) -> User | None:
+        self.store.refresh()
+        return self.replica.find_user_by_email(email)
+
+    def find_user_by_id(self, user_id: UUID) -> User | None:
+        self.store.refresh()
+        return self.replica.find_user_by_id(user_id)
+
+    def add_cart_item(self, cart_item: CartItem):
+        self.add_cart_items(cart_item.user_id, [cart_item])
+
+    def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        with self.store.write():
+            self.replica.add_cart_items(user_id, cart_items)
+
+    def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
+        self.store.refresh()
+        return self.replica.find_cart_items_for_user_id(user_id)
+
+    def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        self.store.refresh()
+        return self.replica.find_cart_lines_for_user_id(user_id)
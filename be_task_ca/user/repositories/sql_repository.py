@@ -1,29 +1,174 @@
-from sqlalchemy.orm import Session
-from typing import List
+from collections import defaultdict
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Literal
 from uuid import UUID
-from .repository import UserRepository
-from be_task_ca.user.models.model import User, CartItem
+from .repository import UserRepository, UserAlreadyExistsError
+from be_task_ca.database import dialect_insert
+from be_task_ca.user.models.model import User, CartItem, CartLine
+from be_task_ca.user.models.sql_model import SQLAlchemyCartItem, SQLAlchemyUser
+from be_task_ca.item.models.sql_model import SQLAlchemyItem
 
-""" SQL Repository """
+"""
+
+SQL Repository
+
+Reads select plain columns, in the field order of the domain dataclasses, and build
+users and cart items straight from the row tuples. This skips ORM identity-map
+bookkeeping, which the read-heavy paths do not need.
+
+Users are always returned with their carts. How the carts are loaded is configurable:
+- "grouped": one query for the users' columns plus one query for the carts of all of
+  them, grouped by user in Python (default)
+- "selectin": ORM users with carts eagerly loaded by a second SELECT ... IN query
+- "joined": ORM users and carts in a single LEFT OUTER JOIN query
+
+"""
+
+CartLoading = Literal["grouped", "selectin", "joined"]
+
+USER_COLUMNS = (
+    SQLAlchemyUser.id,
+    SQLAlchemyUser.email,
+    SQLAlchemyUser.first_name,
+    SQLAlchemyUser.last_name,
+    SQLAlchemyUser.hashed_password,
+    SQLAlchemyUser.shipping_address,
+)
+
+CART_ITEM_COLUMNS = (
+    SQLAlchemyCartItem.user_id,
+    SQLAlchemyCartItem.item_id,
+    SQLAlchemyCartItem.quantity,
+)
+
+
+def user_values(user: User) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "hashed_password": user.hashed_password,
+        "shipping_address": user.shipping_address,
+    }
 
 
 class SQLUserRepository(UserRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cart_loading: CartLoading = "grouped"):
         self.db = db
+        self.cart_loading = cart_loading
+
+    def _fetch_users(self, *criteria) -> List[User]:
+        if self.cart_loading == "selectin":
+            query = select(SQLAlchemyUser).options(
+                selectinload(SQLAlchemyUser.cart_items)
+            )
+            users = self.db.scalars(query.where(*criteria))
+            return [user.to_domain() for user in users]
+        if self.cart_loading == "joined":
+            query = select(SQLAlchemyUser).options(
+                joinedload(SQLAlchemyUser.cart_items)
+            )
+            users = self.db.scalars(query.where(*criteria)).unique()
+            return [user.to_domain() for user in users]
+        return self._fetch_users_grouped(*criteria)
+
+    def _fetch_users_grouped(self, *criteria) -> List[User]:
+        users = [
+            User(*row)
+            for row in self.db.execute(select(*USER_COLUMNS).where(*criteria))
+        ]
+        if users:
+            # One query for the carts of all users, grouped by user in Python
+            carts = defaultdict(list)
+            cart_query = select(*CART_ITEM_COLUMNS).where(
+                SQLAlchemyCartItem.user_id.in_([user.id for user in users])
+            )
+            for row in self.db.execute(cart_query):
+                carts[row.user_id].append(CartItem(*row))
+            for user in users:
+                user.cart_items = carts[user.id]
+        return users
 
     def save_user(self, user: User) -> User:
-        self.db.add(user)
-        self.db.commit()
+        values = user_values(user)
+        try:
+            self.db.execute(insert(SQLAlchemyUser).values(values))
+            self.db.commit()
+            return user
+        except IntegrityError:
+            self.db.rollback()
+
+        # Either the user exists and is being updated, or the email is taken
+        try:
+            result = self.db.execute(
+                update(SQLAlchemyUser)
+                .where(SQLAlchemyUser.id == user.id)
+                .values(values)
+            )
+            if result.rowcount == 0:
+                raise UserAlreadyExistsError(user.email)
+            self.db.commit()
+        except (IntegrityError, UserAlreadyExistsError):
+            self.db.rollback()
+            raise UserAlreadyExistsError(user.email)
         return user
 
     def get_all_users(self) -> List[User]:
-        return self.db.query(User).all()
+        return self._fetch_users()
 
-    def find_user_by_email(self, email: str) -> User:
-        return self.db.query(User).filter(User.email == email).first()
+    def find_user_by_email(self, email: str) -> User | None:
+        users = self._fetch_users(SQLAlchemyUser.email == email)
+        return users[0] if users else None
 
-    def find_user_by_id(self, id: UUID) -> User:
-        return self.db.query(User).filter(User.id == id).first()
+    def find_user_by_id(self, id: UUID) -> User | None:
+        users = self._fetch_users(SQLAlchemyUser.id == id)
+        return users[0] if users else None
+
+    def add_cart_item(self, cart_item: CartItem):
+        self.add_cart_items(cart_item.user_id, [cart_item])
+
+    def add_cart_items(self, user_id: UUID, cart_items: List[CartItem]):
+        # A single INSERT ... ON CONFLICT DO UPDATE merges every line without
+        # reading it first, so concurrent adds never lose increments. A line may
+        # only appear once per statement, and rows go in item order so that
+        # concurrent batches lock the same rows in the same order.
+        quantities = defaultdict(int)
+        for cart_item in cart_items:
+            quantities[cart_item.item_id] += cart_item.quantity
+        if not quantities:
+            return
+        statement = dialect_insert(self.db, SQLAlchemyCartItem).values(
+            [
+                {"user_id": user_id, "item_id": item_id, "quantity": quantity}
+                for item_id, quantity in sorted(quantities.items())
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[SQLAlchemyCartItem.user_id, SQLAlchemyCartItem.item_id],
+            set_={
+                "quantity": SQLAlchemyCartItem.quantity + statement.excluded.quantity
+            },
+        )
+        self.db.execute(statement)
+        self.db.commit()
 
     def find_cart_items_for_user_id(self, user_id: UUID) -> List[CartItem]:
-        return self.db.query(CartItem).filter(CartItem.user_id == user_id).all()
+        query = select(*CART_ITEM_COLUMNS).where(SQLAlchemyCartItem.user_id == user_id)
+        return [CartItem(*row) for row in self.db.execute(query)]
+
+    def find_cart_lines_for_user_id(self, user_id: UUID) -> List[CartLine]:
+        # One join instead of a lookup per item
+        query = (
+            select(
+                SQLAlchemyCartItem.item_id,
+                SQLAlchemyCartItem.quantity,
+                SQLAlchemyItem.name,
+                SQLAlchemyItem.price,
+            )
+            .outerjoin(SQLAlchemyItem, SQLAlchemyItem.id == SQLAlchemyCartItem.item_id)
+            .where(SQLAlchemyCartItem.user_id == user_id)
+        )
+        return [CartLine(*row) for row in self.db.execute(query)]
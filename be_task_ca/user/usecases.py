@@ -1,75 +1,198 @@
 from fastapi import HTTPException
 from uuid import UUID, uuid4  # Import UUID generator
-from .repositories.repository import UserRepository
-from be_task_ca.user.models.model import User, CartItem
+from .repositories.repository import UserAlreadyExistsError
+from .repositories.async_repository import AsyncUserRepository
+from be_task_ca.cache import MISSING, TTLCache
+from be_task_ca.item.repositories.repository import (
+    InsufficientStockError,
+    InvalidQuantityError,
+    ItemNotFoundError,
+)
+from be_task_ca.item.reservations import AsyncStockReservations
+from be_task_ca.user.models.model import User, CartItem, CartView
 from be_task_ca.user.interface.schema import (
     CreateUserRequest,
-    CreateUserResponse,
     AddToCartRequest,
+    CartLineResponse,
+    CartViewResponse,
 )
 
 
-class UserUseCase:
-    def __init__(self, repository: UserRepository):
+def user_already_exists() -> HTTPException:
+    return HTTPException(status_code=400, detail="User with this email already exists")
+
+
+def user_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="User not found")
+
+
+def cart_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="Cart is empty or user not found")
+
+
+# Every error reserving stock can raise, with its HTTP status in stock_error
+STOCK_ERRORS = (InvalidQuantityError, ItemNotFoundError, InsufficientStockError)
+
+
+def stock_error(error: ValueError) -> HTTPException:
+    if isinstance(error, InvalidQuantityError):
+        return HTTPException(status_code=422, detail="Quantity must be positive")
+    if isinstance(error, ItemNotFoundError):
+        return HTTPException(status_code=404, detail="Item not found")
+    return HTTPException(status_code=409, detail="Not enough stock")
+
+
+def new_user_from_request(user: CreateUserRequest) -> User:
+    return User(
+        id=uuid4(),
+        email=user.email,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        hashed_password=user.hashed_password,
+        shipping_address=user.shipping_address,
+    )
+
+
+def user_to_response(user: User) -> dict:
+    """The public fields of a user, as the body of a CreateUserResponse.
+
+    A plain dict, so it can be encoded directly without building a response model;
+    the password hash and the cart are left out.
+    """
+    return {
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "shipping_address": user.shipping_address,
+    }
+
+
+def cart_view_to_response(cart_view: CartView) -> CartViewResponse:
+    return CartViewResponse(
+        lines=[
+            CartLineResponse(
+                item_id=line.item_id,
+                name=line.name,
+                unit_price=line.unit_price,
+                quantity=line.quantity,
+                line_total=line.line_total,
+            )
+            for line in cart_view.lines
+        ],
+        total=cart_view.total,
+    )
+
+
+def merge_cart_lines(
+    user_id: UUID, cart_items: list[AddToCartRequest]
+) -> list[CartItem]:
+    """Collapse repeated items of a batch into one cart line each."""
+    lines: dict[UUID, CartItem] = {}
+    for cart_item in cart_items:
+        line = lines.get(cart_item.item_id)
+        if line:
+            line.quantity += cart_item.quantity
+        else:
+            lines[cart_item.item_id] = CartItem(
+                user_id=user_id,
+                item_id=cart_item.item_id,
+                quantity=cart_item.quantity,
+            )
+    return list(lines.values())
+
+
+class AsyncUserUseCase:
+    def __init__(
+        self,
+        repository: AsyncUserRepository,
+        stock: AsyncStockReservations,
+        cart_view_cache: TTLCache | None = None,
+    ):
         self.repository = repository
+        self.stock = stock
+        # Cart views per user id, dropped whenever the user's cart changes.
+        # Without a cache every view is read from the repository.
+        if cart_view_cache is None:
+            cart_view_cache = TTLCache(maxsize=0, ttl=0)
+        self.cart_view_cache = cart_view_cache
 
-    def create_user(self, user: CreateUserRequest) -> CreateUserResponse:
+    async def create_user(self, user: CreateUserRequest) -> dict:
         # Check if the user already exists by email
-        similar_user = self.repository.find_user_by_email(user.email)
+        similar_user = await self.repository.find_user_by_email(user.email)
         if similar_user:
-            raise HTTPException(
-                status_code=400, detail="User with this email already exists"
-            )
+            raise user_already_exists()
 
-        new_user = User(
-            id=uuid4(),
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            hashed_password=user.hashed_password,
-            shipping_address=user.shipping_address,
-        )
-        self.repository.save_user(new_user)
-        return CreateUserResponse(
-            id=new_user.id,
-            email=new_user.email,
-            first_name=new_user.first_name,
-            last_name=new_user.last_name,
-            shipping_address=new_user.shipping_address,
-        )
+        new_user = new_user_from_request(user)
+        try:
+            await self.repository.save_user(new_user)
+        except UserAlreadyExistsError:
+            # Lost a race against a concurrent signup with the same email
+            raise user_already_exists()
+        return user_to_response(new_user)
 
-    def find_user_by_id(self, user_id: UUID) -> CreateUserResponse:
+    async def find_user_by_id(self, user_id: UUID) -> dict:
         # Fetch a user by their ID
-        user = self.repository.find_user_by_id(user_id)
+        user = await self.repository.find_user_by_id(user_id)
         if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return CreateUserResponse(
-            id=user.id,
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            shipping_address=user.shipping_address,
-        )
+            raise user_not_found()
+        return user_to_response(user)
 
-    def add_item_to_cart(self, user_id: UUID, cart_item: AddToCartRequest):
+    async def add_item_to_cart(self, user_id: UUID, cart_item: AddToCartRequest):
         # Add an item to the user's cart
-        user = self.repository.find_user_by_id(user_id)
+        user = await self.repository.find_user_by_id(user_id)
         if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+            raise user_not_found()
 
         new_cart_item = CartItem(
             user_id=user_id,
             item_id=cart_item.item_id,
             quantity=cart_item.quantity,
         )
-        self.repository.add_cart_item(new_cart_item)
+        try:
+            await self.stock.reserve(user_id, {cart_item.item_id: cart_item.quantity})
+        except STOCK_ERRORS as error:
+            raise stock_error(error)
+        await self.repository.add_cart_item(new_cart_item)
+        self.cart_view_cache.invalidate(user_id)
         return {"message": "Item added to cart successfully"}
 
-    def list_items_in_cart(self, user_id: UUID):
+    async def add_items_to_cart(
+        self, user_id: UUID, cart_items: list[AddToCartRequest]
+    ):
+        # Add many items to the user's cart with one lookup, one reservation and
+        # one write
+        user = await self.repository.find_user_by_id(user_id)
+        if not user:
+            raise user_not_found()
+
+        lines = merge_cart_lines(user_id, cart_items)
+        try:
+            await self.stock.reserve(
+                user_id, {line.item_id: line.quantity for line in lines}
+            )
+        except STOCK_ERRORS as error:
+            raise stock_error(error)
+        await self.repository.add_cart_items(user_id, lines)
+        self.cart_view_cache.invalidate(user_id)
+        return {"message": "Items added to cart successfully"}
+
+    async def list_items_in_cart(self, user_id: UUID):
         # List all items in the user's cart
-        cart_items = self.repository.find_cart_items_for_user_id(user_id)
+        cart_items = await self.repository.find_cart_items_for_user_id(user_id)
         if not cart_items:
-            raise HTTPException(
-                status_code=404, detail="Cart is empty or user not found"
-            )
+            raise cart_not_found()
         return cart_items
+
+    async def get_cart_view(self, user_id: UUID) -> CartViewResponse:
+        # Cart lines with item names, prices and totals, from one read at most
+        cart_view = self.cart_view_cache.get(user_id)
+        if cart_view is MISSING:
+            # A cart write that lands during the read must not be cached over
+            generation = self.cart_view_cache.generation
+            lines = await self.repository.find_cart_lines_for_user_id(user_id)
+            if not lines:
+                raise cart_not_found()
+            cart_view = CartView.create(user_id, lines)
+            self.cart_view_cache.set(user_id, cart_view, generation)
+        return cart_view_to_response(cart_view)
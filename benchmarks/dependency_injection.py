@@ -0,0 +1,126 @@
+"""
+Measures what FastAPI spends resolving the dependencies of a cart request, for the
+previous per-request graph (repo_type query parameter, lazy session lookup, fresh
+repositories, stock reservations and use case on every request) and for the use
+case built once at startup.
+
+Run with: python -m benchmarks.dependency_injection
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
+
+from be_task_ca.cache import TTLCache
+from be_task_ca.container import build_use_cases
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.async_repository import AsyncItemRepository
+from be_task_ca.item.reservations import AsyncStockReservations, SweepSchedule
+from be_task_ca.settings import Settings
+from be_task_ca.user.interface.api import get_user_use_case
+from be_task_ca.user.repositories.async_in_memory_repository import (
+    AsyncInMemoryUserRepository,
+)
+from be_task_ca.user.repositories.async_repository import AsyncUserRepository
+from be_task_ca.user.usecases import AsyncUserUseCase
+
+REQUESTS = 20_000
+
+settings = Settings()
+sweep_schedules = {"memory": SweepSchedule(settings.reservation_sweep_interval_seconds)}
+cart_view_caches = {"memory": TTLCache(maxsize=10_000, ttl=30)}
+
+
+# The previous dependency graph, as the api modules declared it
+def previous_get_db(request: Request):
+    return getattr(request.state, "db", None)
+
+
+def previous_get_item_repository(
+    request: Request, repo_type: str = "memory"
+) -> AsyncItemRepository:
+    if repo_type == "memory":
+        return AsyncInMemoryItemRepository()
+    return previous_get_db(request)
+
+
+def previous_get_user_repository(
+    request: Request, repo_type: str = "memory"
+) -> AsyncUserRepository:
+    if repo_type == "memory":
+        return AsyncInMemoryUserRepository()
+    return previous_get_db(request)
+
+
+def previous_get_stock_reservations(
+    repo_type: str = "memory",
+    item_repository: AsyncItemRepository = Depends(previous_get_item_repository),
+) -> AsyncStockReservations:
+    return AsyncStockReservations(
+        item_repository,
+        ttl=timedelta(seconds=settings.reservation_ttl_seconds),
+        schedule=sweep_schedules[repo_type],
+    )
+
+
+def previous_get_user_use_case(
+    repo_type: str = "memory",
+    repository: AsyncUserRepository = Depends(previous_get_user_repository),
+    stock: AsyncStockReservations = Depends(previous_get_stock_reservations),
+) -> AsyncUserUseCase:
+    return AsyncUserUseCase(repository, stock, cart_view_caches[repo_type])
+
+
+def previous_endpoint(
+    user_use_case: AsyncUserUseCase = Depends(previous_get_user_use_case),
+):
+    pass
+
+
+def current_endpoint(user_use_case: AsyncUserUseCase = Depends(get_user_use_case)):
+    pass
+
+
+def make_request(app: FastAPI) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/users/0/cart",
+            "query_string": b"",
+            "headers": [],
+            "app": app,
+        }
+    )
+
+
+async def resolve_all(endpoint, app: FastAPI) -> float:
+    """Mean microseconds to solve the endpoint's dependencies for a request."""
+    dependant = get_dependant(path="/users/{user_id}/cart", call=endpoint)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        values, errors, *_ = await solve_dependencies(
+            request=make_request(app), dependant=dependant
+        )
+        assert not errors
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def main():
+    app = FastAPI()
+    app.state.use_cases = build_use_cases(settings)
+    print(f"{'graph':<10} {'us per request':>15}")
+    for label, endpoint in (
+        ("previous", previous_endpoint),
+        ("startup", current_endpoint),
+    ):
+        print(f"{label:<10} {asyncio.run(resolve_all(endpoint, app)):>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
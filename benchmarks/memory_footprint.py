@@ -0,0 +1,142 @@
+"""
+Measures the bytes each item, user and cart line costs in memory, against the
+previous layout: dataclasses with a per-instance __dict__, and carts holding one
+CartItem object, with its own UUID, per line. Items and users are measured in a
+plain dict keyed by id, without the repositories' secondary indexes.
+
+Run with: python -m benchmarks.memory_footprint
+"""
+
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from be_task_ca.item.models.model import Item
+from be_task_ca.user.models.model import CartItem, User
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+
+COUNT = 100_000
+CATALOG_SIZE = 1_000  # cart lines reference items of a catalog this large
+LINES_PER_CART = 10
+
+
+@dataclass
+class DictItem:
+    id: UUID
+    name: str
+    description: str
+    price: float
+    quantity: int
+
+
+@dataclass
+class DictUser:
+    id: UUID
+    email: str
+    first_name: str
+    last_name: str
+    hashed_password: str
+    shipping_address: Optional[str] = None
+    cart_items: List["DictCartItem"] = field(default_factory=list)
+
+
+@dataclass
+class DictCartItem:
+    user_id: UUID
+    item_id: UUID
+    quantity: int
+
+
+def measure(build: Callable[[], object]) -> float:
+    """Bytes allocated per entry by build, which must keep what it creates alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / COUNT
+
+
+def previous_items() -> Dict[UUID, DictItem]:
+    return {
+        (id := uuid4()): DictItem(id, f"item {n}", "description", 9.99, n)
+        for n in range(COUNT)
+    }
+
+
+def current_items() -> Dict[UUID, Item]:
+    return {
+        (id := uuid4()): Item(id, f"item {n}", "description", 9.99, n)
+        for n in range(COUNT)
+    }
+
+
+def previous_users() -> Dict[UUID, DictUser]:
+    return {
+        (id := uuid4()): DictUser(id, f"user{n}@example.com", "Bench", "User", "hash")
+        for n in range(COUNT)
+    }
+
+
+def current_users() -> Dict[UUID, User]:
+    return {
+        (id := uuid4()): User(id, f"user{n}@example.com", "Bench", "User", "hash")
+        for n in range(COUNT)
+    }
+
+
+def request_item_id(catalog: List[UUID], n: int) -> UUID:
+    # Every request parses its own copy of the item id
+    return UUID(bytes=catalog[n % CATALOG_SIZE].bytes)
+
+
+def previous_cart_lines(catalog: List[UUID], user_ids: List[UUID]):
+    carts: Dict[UUID, Dict[UUID, DictCartItem]] = {}
+    for n in range(COUNT):
+        user_id = user_ids[n // LINES_PER_CART]
+        item_id = request_item_id(catalog, n)
+        carts.setdefault(user_id, {})[item_id] = DictCartItem(user_id, item_id, 1)
+    return carts
+
+
+def current_cart_lines(catalog: List[UUID], user_ids: List[UUID]):
+    repository = InMemoryUserRepository()
+    for n in range(COUNT):
+        user_id = user_ids[n // LINES_PER_CART]
+        repository.add_cart_item(CartItem(user_id, request_item_id(catalog, n), 1))
+    return repository
+
+
+def report(label: str, previous: float, current: float):
+    print(f"{label:<10} {previous:>14.0f} {current:>14.0f} {previous / current:>8.1f}x")
+
+
+def main():
+    print(f"{'per':<10} {'previous (B)':>14} {'current (B)':>14}")
+    report("item", measure(previous_items), measure(current_items))
+    report("user", measure(previous_users), measure(current_users))
+
+    # Cart owners and the catalog exist beforehand, so only the lines are measured
+    catalog = [uuid4() for _ in range(CATALOG_SIZE)]
+    InMemoryUserRepository.clear_storage()
+    owners = [
+        InMemoryUserRepository().save_user(
+            User.create(f"owner{n}@example.com", "Bench", "User", "hash")
+        )
+        for n in range(COUNT // LINES_PER_CART)
+    ]
+    user_ids = [owner.id for owner in owners]
+    report(
+        "cart line",
+        measure(lambda: previous_cart_lines(catalog, user_ids)),
+        measure(lambda: current_cart_lines(catalog, user_ids)),
+    )
+    InMemoryUserRepository.clear_storage()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compares the two ways of encoding a 10k item catalog listing: the previous path,
+which copied every item into a response model and had FastAPI validate and encode
+it through response_model, and the direct orjson encoding of the domain items.
+
+Run with: python -m benchmarks.serialization
+"""
+
+import asyncio
+import json
+import timeit
+from functools import partial
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from be_task_ca.item.interface.schema import AllItemsResponse
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.usecases import item_to_response, items_page_response
+
+ITEM_COUNT = 10_000
+REPEAT = 20
+
+response_field = create_response_field(name="response", type_=AllItemsResponse)
+
+
+def response_models(items: list[Item]) -> bytes:
+    """Copy into response models, validate against response_model, encode."""
+    response = AllItemsResponse(items=[item_to_response(item) for item in items])
+    content = asyncio.run(
+        serialize_response(field=response_field, response_content=response)
+    )
+    return JSONResponse(content).body
+
+
+def direct(items: list[Item]) -> bytes:
+    return ORJSONResponse(items_page_response(items)).body
+
+
+def main():
+    items = [
+        Item.create(f"item {n}", "A fine item", 9.99, n) for n in range(ITEM_COUNT)
+    ]
+    assert json.loads(response_models(items)) == json.loads(direct(items))
+
+    print(f"{'path':<16} {'ms per 10k items':>18}")
+    for label, encode in (
+        ("response models", response_models),
+        ("orjson direct", direct),
+    ):
+        run = partial(encode, items)
+        seconds = min(timeit.repeat(run, number=1, repeat=REPEAT))
+        print(f"{label:<16} {seconds * 1e3:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Measures how quickly a fresh process can serve: the import time of be_task_ca.app
+taken from python -X importtime, with and without the SQL stack that is now only
+imported by the SQL backend, and the time from launching uvicorn to the first
+answered request on each backend.
+
+Run with: python -m benchmarks.startup [--runs 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.http_api import create_schema, free_port
+
+IMPORTS = {
+    "app": "import be_task_ca.app",
+    "app + SQL stack": (
+        "import be_task_ca.app, be_task_ca.database,"
+        " be_task_ca.item.repositories.async_sql_repository,"
+        " be_task_ca.user.repositories.async_sql_repository"
+    ),
+}
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module, from a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # Nested imports are indented by two spaces per level
+        times[module[1:].rstrip()] = int(cumulative)
+    return times
+
+
+def total_import_time(times: Dict[str, int]) -> float:
+    # Only top-level imports are unindented, so their sum is the whole import
+    return sum(times[module] for module in times if module == module.lstrip())
+
+
+def time_to_first_request(backend: str, env: Dict[str, str]) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "be_task_ca.app:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, **env, "BE_TASK_CA_REPOSITORY": backend},
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    # Listing items reaches the repositories, and the database
+                    client.get("/items/").raise_for_status()
+                    return time.perf_counter() - start
+                except httpx.TransportError:
+                    time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def median_ms(samples: List[float]) -> float:
+    return statistics.median(samples) * 1e3
+
+
+def main():
+    # The first paragraph of the module docstring, unwrapped
+    summary = " ".join(__doc__.strip().split("\n\n")[0].split())
+    parser = argparse.ArgumentParser(description=summary)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports shown")
+    args = parser.parse_args()
+
+    print(f"{'import':<18} {'median (ms)':>12}")
+    slowest: List[Tuple[str, int]] = []
+    for label, statement in IMPORTS.items():
+        runs = [import_times(statement) for _ in range(args.runs)]
+        samples = [total_import_time(times) / 1e6 for times in runs]
+        print(f"{label:<18} {median_ms(samples):>12.1f}")
+        if label == "app":
+            slowest = sorted(runs[-1].items(), key=lambda entry: -entry[1])
+    print()
+    print("slowest imports of the app, cumulative (ms)")
+    for module, microseconds in slowest[: args.top]:
+        print(f"  {module.strip():<48} {microseconds / 1e3:>8.1f}")
+    print()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite+aiosqlite:///{directory}/startup.db"
+        asyncio.run(create_schema(database_url))
+        env = {
+            "BE_TASK_CA_ASYNC_DATABASE_URL": database_url,
+            "BE_TASK_CA_SHARED_MEMORY_PATH": f"{directory}/startup.store",
+        }
+        print(f"{'backend':<18} {'first request (ms)':>19}")
+        for backend in ("memory", "shared", "sql"):
+            samples = [time_to_first_request(backend, env) for _ in range(args.runs)]
+            print(f"{backend:<18} {median_ms(samples):>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compares the indexed InMemoryUserRepository with the previous list-based layout
+(linear email scan on signup, linear cart scan on add-to-cart).
+
+Run with: python -m benchmarks.user_repository
+"""
+
+import timeit
+from typing import Dict, List
+from uuid import UUID, uuid4
+
+from be_task_ca.user.models.model import CartItem, User
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+
+USER_COUNTS = [1_000, 10_000, 100_000]
+CART_SIZES = [10, 100, 1_000]
+REPEAT = 200
+
+
+class ListBasedUserRepository:
+    """The layout InMemoryUserRepository used before the email/cart indexes."""
+
+    def __init__(self):
+        self._users: Dict[UUID, User] = {}
+        self._cart_items: Dict[UUID, List[CartItem]] = {}
+
+    def save_user(self, user: User) -> User:
+        self._users[user.id] = user
+        return user
+
+    def find_user_by_email(self, email: str) -> User | None:
+        for user in self._users.values():
+            if user.email == email:
+                return user
+        return None
+
+    def add_cart_item(self, cart_item: CartItem):
+        cart = self._cart_items.setdefault(cart_item.user_id, [])
+        existing_item = next(
+            (item for item in cart if item.item_id == cart_item.item_id), None
+        )
+        if existing_item:
+            existing_item.quantity += cart_item.quantity
+        else:
+            cart.append(cart_item)
+
+
+def make_user(n: int) -> User:
+    return User.create(
+        email=f"user{n}@example.com",
+        first_name="Bench",
+        last_name="User",
+        hashed_password="hashed",
+    )
+
+
+def bench_signup(repository, user_count: int) -> float:
+    """Mean seconds for a signup: duplicate check on an unknown email + save."""
+    for n in range(user_count):
+        repository.save_user(make_user(n))
+    counter = iter(range(user_count, user_count + REPEAT))
+
+    def signup():
+        user = make_user(next(counter))
+        if repository.find_user_by_email(user.email) is None:
+            repository.save_user(user)
+
+    return timeit.timeit(signup, number=REPEAT) / REPEAT
+
+
+def bench_add_to_cart(repository, cart_size: int) -> float:
+    """Mean seconds to merge a line into a cart holding cart_size lines."""
+    user = repository.save_user(make_user(0))
+    item_ids = [uuid4() for _ in range(cart_size)]
+    for item_id in item_ids:
+        repository.add_cart_item(CartItem(user.id, item_id, 1))
+    last_item_id = item_ids[-1]  # worst case for the linear scan
+
+    def add_to_cart():
+        repository.add_cart_item(CartItem(user.id, last_item_id, 1))
+
+    return timeit.timeit(add_to_cart, number=REPEAT) / REPEAT
+
+
+def indexed_repository() -> InMemoryUserRepository:
+    InMemoryUserRepository.clear_storage()
+    return InMemoryUserRepository()
+
+
+def report(label: str, size: int, list_based: float, indexed: float):
+    print(
+        f"{label:<12} {size:>9,} {list_based * 1e6:>12.2f} {indexed * 1e6:>12.2f}"
+        f" {list_based / indexed:>8.1f}x"
+    )
+
+
+def main():
+    print(f"{'operation':<12} {'size':>9} {'list (us)':>12} {'indexed (us)':>12}")
+    for user_count in USER_COUNTS:
+        report(
+            "signup",
+            user_count,
+            bench_signup(ListBasedUserRepository(), user_count),
+            bench_signup(indexed_repository(), user_count),
+        )
+    for cart_size in CART_SIZES:
+        report(
+            "add_to_cart",
+            cart_size,
+            bench_add_to_cart(ListBasedUserRepository(), cart_size),
+            bench_add_to_cart(indexed_repository(), cart_size),
+        )
+    InMemoryUserRepository.clear_storage()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import subprocess
+import sys
 import uvicorn
 
 
@@ -24,3 +25,7 @@ def create_dependency_graph():
 
 def check_types():
     subprocess.call(["mypy", "be_task_ca"])
+
+
+def run_benchmarks():
+    subprocess.call([sys.executable, "-m", "benchmarks.http_api", *sys.argv[1:]])
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, StaticPool
+
+from be_task_ca.database import Base
+from be_task_ca.shared_memory import SharedMemoryStore
+
+# Importing the models registers their tables on Base.metadata
+from be_task_ca.item.models.sql_model import SQLAlchemyItem  # noqa: F401
+from be_task_ca.user.models.sql_model import SQLAlchemyUser  # noqa: F401
+
+
+@pytest.fixture
+def sql_engine():
+    """A fresh in-memory SQLite database with the schema created."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sql_session(sql_engine):
+    with Session(sql_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def sql_api(tmp_path):
+    """A session factory for a fresh SQLite database file, to build SQL use cases.
+
+    The test client runs every request on a new event loop, so connections are not
+    pooled across requests.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool
+    )
+
+    async def create_schema():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def shared_store(tmp_path):
+    """An open shared store in a fresh file, journaling the in-memory repositories."""
+    store = SharedMemoryStore(tmp_path / "shared.store", 2**20)
+    store.open()
+    yield store
+    store.close()
@@ -0,0 +1,147 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from be_task_ca.cache import TTLCache
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.repositories.async_cached_repository import (
+    AsyncCachedItemRepository,
+)
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+
+
+class CountingItemRepository(AsyncInMemoryItemRepository):
+    """In-memory repository that counts the lookups reaching it."""
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+        # When set, lookups hold on to what they read until the gate opens
+        self.gate: asyncio.Event | None = None
+
+    async def find_item_by_id(self, id):
+        self.lookups += 1
+        item = await super().find_item_by_id(id)
+        if self.gate is not None:
+            await self.gate.wait()
+        return item
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repository():
+    InMemoryItemRepository.clear_storage()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def inner():
+    return CountingItemRepository()
+
+
+@pytest.fixture
+def repository(inner, clock):
+    return AsyncCachedItemRepository(inner, TTLCache(maxsize=2, ttl=10, clock=clock))
+
+
+def save(repository, name: str) -> Item:
+    return asyncio.run(repository.save_item(Item.create(name, "Test Desc", 10.5, 100)))
+
+
+def test_repeated_lookups_are_served_from_cache(repository, inner):
+    """tests that only the first lookup of an item reaches the repository"""
+    item = save(inner, "Test Item")
+    assert asyncio.run(repository.find_item_by_id(item.id)) == item
+    assert asyncio.run(repository.find_item_by_id(item.id)) == item
+    assert inner.lookups == 1
+    assert repository.cache.hits == 1
+    assert repository.cache.misses == 1
+
+
+def test_save_invalidates_cached_reads(repository):
+    """tests that a saved item shows up in cached listings right away"""
+    save(repository, "First")
+    assert len(asyncio.run(repository.get_all_items())) == 1
+    save(repository, "Second")
+    assert len(asyncio.run(repository.get_all_items())) == 2
+
+
+def test_missing_items_are_not_cached(repository):
+    """tests that a negative lookup does not hide an item created later"""
+    assert asyncio.run(repository.find_item_by_name("Test Item")) is None
+    InMemoryItemRepository().save_item(Item.create("Test Item", "Desc", 1.0, 1))
+    assert asyncio.run(repository.find_item_by_name("Test Item")) is not None
+
+
+def test_entries_expire_after_ttl(repository, inner, clock):
+    """tests that an entry is fetched again once its TTL has passed"""
+    item = save(inner, "Test Item")
+    asyncio.run(repository.find_item_by_id(item.id))
+    clock.now = 11
+    asyncio.run(repository.find_item_by_id(item.id))
+    assert inner.lookups == 2
+
+
+def test_least_recently_used_entry_is_evicted(repository, inner):
+    """tests that the cache stays within its size by evicting the LRU entry"""
+    items = [save(inner, f"Item {n}") for n in range(3)]
+    for item in items:
+        asyncio.run(repository.find_item_by_id(item.id))
+    assert repository.cache.stats()["size"] == 2
+    assert repository.cache.evictions == 1
+    asyncio.run(repository.find_item_by_id(items[0].id))
+    assert inner.lookups == 4
+
+
+def test_lookup_overlapping_a_write_is_not_cached(repository, inner):
+    """tests that a read started before a write does not cache the old item"""
+    item = save(repository, "Test Item")
+
+    async def read_during_write():
+        inner.gate = asyncio.Event()
+        read = asyncio.create_task(repository.find_item_by_id(item.id))
+        await asyncio.sleep(0)  # the read has the old item and waits at the gate
+        await repository.save_item(replace(item, quantity=1))
+        inner.gate.set()
+        stale = await read
+        inner.gate = None
+        return stale, await repository.find_item_by_id(item.id)
+
+    stale, fresh = asyncio.run(read_during_write())
+    assert stale.quantity == 100
+    assert fresh.quantity == 1
+
+
+def test_stock_changes_invalidate_every_cached_read(repository):
+    """tests that listings and lookups by name follow reservations and releases"""
+    item = save(repository, "Test Item")
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ttl = timedelta(minutes=15)
+
+    def quantities():
+        by_name = asyncio.run(repository.find_item_by_name("Test Item"))
+        listed = asyncio.run(repository.get_all_items())
+        return by_name.quantity, [listed_item.quantity for listed_item in listed]
+
+    assert quantities() == (100, [100])
+    reservation = Reservation.create(uuid4(), item.id, 40, now, ttl)
+    asyncio.run(repository.reserve_stock([reservation]))
+    assert quantities() == (60, [60])
+    assert asyncio.run(repository.release_expired_reservations(now + ttl)) == 1
+    assert quantities() == (100, [100])
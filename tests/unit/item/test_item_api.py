@@ -1,6 +1,12 @@
+import json
+import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
+from be_task_ca.container import build_use_cases
+from be_task_ca.settings import Settings
 from be_task_ca.item.interface.api import item_router
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
 
 app = FastAPI()
 app.include_router(item_router)
@@ -8,6 +14,12 @@ app.include_router(item_router)
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_in_memory_repository():
+    InMemoryItemRepository.clear_storage()
+    app.state.use_cases = build_use_cases(Settings())
+
+
 def test_post_item():
     """tests that an item can be created via the API"""
     response = client.post(
@@ -36,7 +48,25 @@ def test_get_items():
     )
     response = client.get("/items/")
     assert response.status_code == 200
-    assert len(response.json()) == 1
+    assert len(response.json()["items"]) == 1
+
+
+def test_get_items_matches_response_model():
+    """tests that the directly encoded listing has the documented shape"""
+    item = InMemoryItemRepository().save_item(Item.create("Test Item", None, 10.5, 100))
+    response = client.get("/items/")
+    assert response.json() == {
+        "items": [
+            {
+                "id": str(item.id),
+                "name": "Test Item",
+                "description": None,
+                "price": 10.5,
+                "quantity": 100,
+            }
+        ],
+        "next_cursor": None,
+    }
 
 
 def test_post_item_missing_fields():
@@ -62,3 +92,92 @@ def test_post_item_invalid_types():
         },
     )
     assert response.status_code == 422
+
+
+def test_post_item_duplicate_name():
+    """tests that an item cannot be created twice with the same name"""
+    payload = {
+        "name": "Unique Item",
+        "description": "Test Desc",
+        "price": 10.5,
+        "quantity": 100,
+    }
+    assert client.post("/items/", json=payload).status_code == 200
+    response = client.post("/items/", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Item with this name already exists"
+
+
+def create_items(*names):
+    for name in names:
+        client.post(
+            "/items/",
+            json={"name": name, "description": None, "price": 1.0, "quantity": 1},
+        )
+
+
+def test_get_items_paginated():
+    """tests that the listing api pages through the catalog by name"""
+    create_items("c", "a", "e", "b", "d")
+    first = client.get("/items/", params={"limit": 2}).json()
+    assert [item["name"] for item in first["items"]] == ["a", "b"]
+    second = client.get(
+        "/items/", params={"limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert [item["name"] for item in second["items"]] == ["c", "d"]
+    last = client.get(
+        "/items/", params={"limit": 2, "cursor": second["next_cursor"]}
+    ).json()
+    assert [item["name"] for item in last["items"]] == ["e"]
+    assert last["next_cursor"] is None
+
+
+def test_stream_items():
+    """tests that the streaming api returns every item as one JSON line"""
+    repository = InMemoryItemRepository()
+    for n in range(1200):  # spans several keyset batches
+        repository.save_item(Item.create(f"item-{n:04}", "Test Desc", 1.0, 1))
+    response = client.get("/items/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert len(lines) == 1200
+    assert json.loads(lines[0])["name"] == "item-0000"
+    assert json.loads(lines[-1])["name"] == "item-1199"
+
+
+def test_post_items_bulk():
+    """tests that a bulk import creates new items and reports rejected rows"""
+    create_items("existing")
+    response = client.post(
+        "/items/bulk",
+        json=[
+            {"name": "new-1", "price": 1.0, "quantity": 1},
+            {"name": "existing", "price": 1.0, "quantity": 1},
+            {"name": "new-2", "price": 2.0, "quantity": 2},
+            {"name": "new-1", "price": 3.0, "quantity": 3},
+        ],
+    )
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["created"]] == ["new-1", "new-2"]
+    assert response.json()["errors"] == [
+        {
+            "index": 1,
+            "name": "existing",
+            "detail": "Item with this name already exists",
+        },
+        {"index": 3, "name": "new-1", "detail": "Duplicate name within the batch"},
+    ]
+    listing = client.get("/items/").json()["items"]
+    assert [item["name"] for item in listing] == ["existing", "new-1", "new-2"]
+
+
+def test_post_and_get_items_sql(sql_api):
+    """tests that items can be created and listed through the SQL repository"""
+    app.state.use_cases = build_use_cases(Settings(repository="sql"), sql_api)
+    payload = {"name": "Test Item", "price": 10.5, "quantity": 100}
+    response = client.post("/items/", json=payload)
+    assert response.status_code == 200
+    assert client.post("/items/", json=payload).status_code == 400
+    items = client.get("/items/").json()["items"]
+    assert items == [response.json()]
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.async_shared_memory_repository import (
+    AsyncSharedMemoryItemRepository,
+)
+from be_task_ca.item.repositories.async_sql_repository import AsyncSQLItemRepository
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.item.repositories.repository import (
+    InsufficientStockError,
+    InvalidQuantityError,
+    ItemAlreadyExistsError,
+)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TTL = timedelta(minutes=15)
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repository():
+    InMemoryItemRepository.clear_storage()
+
+
+@pytest.fixture(params=["memory", "shared", "sql"])
+def repository(request):
+    if request.param == "memory":
+        return AsyncInMemoryItemRepository()
+    if request.param == "shared":
+        return AsyncSharedMemoryItemRepository(request.getfixturevalue("shared_store"))
+    return AsyncSQLItemRepository(request.getfixturevalue("sql_api"))
+
+
+def test_save_and_find_item(repository):
+    """Tests that a saved item can be found by id and by name."""
+
+    async def scenario():
+        item = await repository.save_item(Item.create("Test Item", None, 10.5, 100))
+        assert await repository.find_item_by_id(item.id) == item
+        assert await repository.find_item_by_name("Test Item") == item
+        assert await repository.find_item_by_name("Unknown") is None
+        with pytest.raises(ItemAlreadyExistsError):
+            await repository.save_item(Item.create("Test Item", "Other", 1.0, 1))
+        assert await repository.get_all_items() == [item]
+
+    asyncio.run(scenario())
+
+
+def test_save_items_is_all_or_nothing(repository):
+    """Tests that a bulk insert with a taken name inserts nothing."""
+
+    async def scenario():
+        await repository.save_items([Item.create(n, None, 1.0, 1) for n in "abc"])
+        with pytest.raises(ItemAlreadyExistsError):
+            await repository.save_items([Item.create(n, None, 1.0, 1) for n in "xb"])
+        found = await repository.find_items_by_names(["a", "x"])
+        assert [item.name for item in found] == ["a"]
+        assert len(await repository.get_all_items()) == 3
+
+    asyncio.run(scenario())
+
+
+def test_iter_items_in_keyset_pages(repository):
+    """Tests that the catalog is walked in name order across pages."""
+
+    async def scenario():
+        await repository.save_items([Item.create(n, None, 1.0, 1) for n in "dbeac"])
+        page = await repository.get_items_page("b", 2)
+        assert [item.name for item in page] == ["c", "d"]
+        names = [item.name async for item in repository.iter_items(batch_size=2)]
+        assert names == list("abcde")
+
+    asyncio.run(scenario())
+
+
+def test_reservations_take_and_return_stock(repository):
+    """Tests that reserved stock is held until the reservation expires."""
+
+    async def scenario():
+        item = await repository.save_item(Item.create("Item", None, 1.0, 5))
+        await repository.reserve_stock(
+            [Reservation.create(uuid4(), item.id, 4, NOW, TTL)]
+        )
+        assert (await repository.find_item_by_id(item.id)).quantity == 1
+        with pytest.raises(InsufficientStockError):
+            await repository.reserve_stock(
+                [Reservation.create(uuid4(), item.id, 2, NOW, TTL)]
+            )
+        assert await repository.release_expired_reservations(NOW + TTL) == 1
+        assert (await repository.find_item_by_id(item.id)).quantity == 5
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("quantity", [0, -3])
+def test_non_positive_reservations_are_refused(repository, quantity):
+    """Tests that a reservation cannot put stock back with a quantity below one."""
+
+    async def scenario():
+        item = await repository.save_item(Item.create("Item", None, 1.0, 5))
+        with pytest.raises(InvalidQuantityError):
+            await repository.reserve_stock(
+                [
+                    Reservation.create(uuid4(), item.id, 1, NOW, TTL),
+                    Reservation.create(uuid4(), item.id, quantity, NOW, TTL),
+                ]
+            )
+        assert (await repository.find_item_by_id(item.id)).quantity == 5
+        assert await repository.release_expired_reservations(NOW + TTL) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+import pytest
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.repositories.repository import ItemAlreadyExistsError
+from be_task_ca.item.repositories.sql_repository import SQLItemRepository
+
+
+@pytest.fixture
+def repository(sql_session):
+    return SQLItemRepository(sql_session)
+
+
+def test_save_and_find_item(repository):
+    """tests that a saved item can be found by id and by name"""
+    item = repository.save_item(Item.create("Test Item", None, 10.5, 100))
+    assert repository.find_item_by_id(item.id) == item
+    assert repository.find_item_by_name("Test Item") == item
+    assert repository.find_item_by_name("Unknown") is None
+
+
+def test_save_item_updates_existing_item(repository):
+    """tests that saving an item again updates it in place"""
+    item = repository.save_item(Item.create("Test Item", "Test Desc", 10.5, 100))
+    item.price = 12.0
+    repository.save_item(item)
+    assert repository.get_all_items() == [item]
+
+
+def test_save_item_with_taken_name(repository):
+    """tests that a second item with the same name is rejected"""
+    repository.save_item(Item.create("Test Item", "Test Desc", 10.5, 100))
+    with pytest.raises(ItemAlreadyExistsError):
+        repository.save_item(Item.create("Test Item", "Other Desc", 1.0, 1))
+    assert len(repository.get_all_items()) == 1
+
+
+def test_save_items_is_all_or_nothing(repository):
+    """tests that a bulk insert with a taken name inserts nothing"""
+    repository.save_items([Item.create(name, None, 1.0, 1) for name in "abc"])
+    with pytest.raises(ItemAlreadyExistsError):
+        repository.save_items([Item.create(name, None, 1.0, 1) for name in "xb"])
+    assert sorted(item.name for item in repository.get_all_items()) == list("abc")
+    assert [item.name for item in repository.find_items_by_names(["a", "x"])] == ["a"]
+
+
+def test_iter_items_in_keyset_pages(repository):
+    """tests that the catalog is walked in name order across pages"""
+    repository.save_items([Item.create(name, None, 1.0, 1) for name in "dbeac"])
+    assert [item.name for item in repository.get_items_page("b", 2)] == ["c", "d"]
+    assert [item.name for item in repository.iter_items(batch_size=2)] == list("abcde")
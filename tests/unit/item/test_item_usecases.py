@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from be_task_ca.item.interface.schema import CreateItemRequest
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.item.usecases import AsyncItemUseCase
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repository():
+    InMemoryItemRepository.clear_storage()
+
+
+@pytest.fixture
+def use_case():
+    return AsyncItemUseCase(AsyncInMemoryItemRepository())
+
+
+def request(name: str) -> CreateItemRequest:
+    return CreateItemRequest(name=name, description="Desc", price=1.5, quantity=3)
+
+
+def test_create_item_rejects_taken_names(use_case):
+    """Tests that an item name can only be used once."""
+    created = asyncio.run(use_case.create_item(request("Item")))
+    assert created.name == "Item"
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(use_case.create_item(request("Item")))
+    assert error.value.status_code == 400
+
+
+def test_create_items_reports_rows_it_skips(use_case):
+    """Tests that a bulk import creates the free names and reports the others."""
+    asyncio.run(use_case.create_item(request("a")))
+    response = asyncio.run(
+        use_case.create_items([request("a"), request("b"), request("b")])
+    )
+    assert [item.name for item in response.created] == ["b"]
+    assert [(error.index, error.detail) for error in response.errors] == [
+        (0, "Item with this name already exists"),
+        (2, "Duplicate name within the batch"),
+    ]
+
+
+def test_items_page_has_a_cursor_while_full(use_case):
+    """Tests that a full page points at the next one and the last page does not."""
+    asyncio.run(use_case.create_items([request(name) for name in "cab"]))
+    first = asyncio.run(use_case.get_items_page(None, 2))
+    assert [item.name for item in first["items"]] == ["a", "b"]
+    assert first["next_cursor"] == "b"
+    last = asyncio.run(use_case.get_items_page(first["next_cursor"], 2))
+    assert [item.name for item in last["items"]] == ["c"]
+    assert last["next_cursor"] is None
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.item.repositories.repository import (
+    InsufficientStockError,
+    ItemNotFoundError,
+)
+from be_task_ca.item.repositories.sql_repository import SQLItemRepository
+from be_task_ca.item.reservations import AsyncStockReservations, SweepSchedule
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TTL = timedelta(minutes=15)
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repository():
+    InMemoryItemRepository.clear_storage()
+
+
+@pytest.fixture(params=["memory", "sql"])
+def repository(request):
+    if request.param == "memory":
+        return InMemoryItemRepository()
+    return SQLItemRepository(request.getfixturevalue("sql_session"))
+
+
+def test_reserve_stock_is_all_or_nothing(repository):
+    """Tests that a reservation takes stock, and a failed batch takes none."""
+    item = repository.save_item(Item.create("Item", "Desc", 1.0, 5))
+    other = repository.save_item(Item.create("Other", "Desc", 1.0, 5))
+    user_id = uuid4()
+
+    repository.reserve_stock([Reservation.create(user_id, item.id, 4, NOW, TTL)])
+    assert repository.find_item_by_id(item.id).quantity == 1
+
+    with pytest.raises(InsufficientStockError):
+        repository.reserve_stock(
+            [
+                Reservation.create(user_id, other.id, 5, NOW, TTL),
+                Reservation.create(user_id, item.id, 2, NOW, TTL),
+            ]
+        )
+    with pytest.raises(ItemNotFoundError):
+        repository.reserve_stock([Reservation.create(user_id, uuid4(), 1, NOW, TTL)])
+    assert repository.find_item_by_id(item.id).quantity == 1
+    assert repository.find_item_by_id(other.id).quantity == 5
+
+
+def test_expired_reservations_return_to_stock(repository):
+    """Tests that only reservations past their expiry go back to stock."""
+    item = repository.save_item(Item.create("Item", "Desc", 1.0, 5))
+    user_id = uuid4()
+    repository.reserve_stock(
+        [
+            Reservation.create(user_id, item.id, 2, NOW, TTL),
+            Reservation.create(user_id, item.id, 1, NOW, TTL * 2),
+        ]
+    )
+    assert repository.find_item_by_id(item.id).quantity == 2
+
+    assert repository.release_expired_reservations(NOW + TTL) == 1
+    assert repository.find_item_by_id(item.id).quantity == 4
+    assert repository.release_expired_reservations(NOW + TTL) == 0
+    assert repository.release_expired_reservations(NOW + TTL * 2) == 1
+    assert repository.find_item_by_id(item.id).quantity == 5
+
+
+def test_concurrent_reservations_never_oversell():
+    """Tests that threads racing for a hot item cannot reserve more than stock."""
+    repository = InMemoryItemRepository()
+    item = repository.save_item(Item.create("Item", "Desc", 1.0, 50))
+    reserved = []
+
+    def reserve():
+        for _ in range(20):
+            try:
+                repository.reserve_stock(
+                    [Reservation.create(uuid4(), item.id, 1, NOW, TTL)]
+                )
+                reserved.append(1)
+            except InsufficientStockError:
+                pass
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(reserved) == 50
+    assert repository.find_item_by_id(item.id).quantity == 0
+
+
+def test_stock_reservations_sweep_lazily():
+    """Tests that reserving sweeps expired reservations once per interval."""
+    repository = AsyncInMemoryItemRepository()
+    item = InMemoryItemRepository().save_item(Item.create("Item", "Desc", 1.0, 1))
+    now = [NOW]
+    ticks = [0.0]
+    stock = AsyncStockReservations(
+        repository,
+        ttl=TTL,
+        schedule=SweepSchedule(interval=30, clock=lambda: ticks[0]),
+        now=lambda: now[0],
+    )
+
+    asyncio.run(stock.reserve(uuid4(), {item.id: 1}))
+    now[0] += TTL
+    with pytest.raises(InsufficientStockError):
+        # the last sweep was too recent
+        asyncio.run(stock.reserve(uuid4(), {item.id: 1}))
+
+    ticks[0] += 30
+    asyncio.run(stock.reserve(uuid4(), {item.id: 1}))
+    assert InMemoryItemRepository().find_item_by_id(item.id).quantity == 0
+
+
+def test_dump_during_a_sweep_keeps_the_reserved_stock():
+    """Tests that a dump never shows stock taken without the reservation holding it."""
+    repository = InMemoryItemRepository()
+    item = repository.save_item(Item.create("Item", "Desc", 1.0, 10))
+    repository.reserve_stock([Reservation.create(uuid4(), item.id, 4, NOW, TTL)])
+
+    # Hold the item's stripe so the sweep stops between popping the reservation
+    # and returning its stock
+    with InMemoryItemRepository._locks(item.id):
+        sweep = threading.Thread(
+            target=repository.release_expired_reservations, args=(NOW + TTL,)
+        )
+        sweep.start()
+        while not InMemoryItemRepository._releasing:
+            time.sleep(0.001)
+        dumps = []
+        dump = threading.Thread(
+            target=lambda: dumps.append(InMemoryItemRepository.dump())
+        )
+        dump.start()
+    sweep.join()
+    dump.join()
+
+    ((items, reservations),) = dumps
+    held = sum(reservation.quantity for reservation in reservations)
+    assert items[0].quantity + held == 10
+    assert repository.find_item_by_id(item.id).quantity == 10
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from be_task_ca.app import app
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+
+
+@pytest.fixture
+def client():
+    InMemoryItemRepository.clear_storage()
+    # Entering the client runs the lifespan, which builds the use cases
+    with TestClient(app) as client:
+        yield client
+
+
+def test_use_cases_are_built_once_at_startup(client):
+    """Tests that every request is served by the use cases built at startup."""
+    use_cases = app.state.use_cases
+    assert client.get("/items/").status_code == 200
+    response = client.post(
+        "/items/", json={"name": "Test Item", "price": 1.0, "quantity": 1}
+    )
+    assert response.status_code == 200
+    assert app.state.use_cases is use_cases
+    assert client.get("/items/").json()["items"] == [response.json()]
+
+
+def test_db_pool_status_without_engine(client):
+    """Tests that the memory backend reports the pool unused instead of building it."""
+    response = client.get("/health/db-pool")
+    assert response.status_code == 200
+    assert response.json() == {"status": "unused"}
+
+
+def test_memory_backend_starts_without_sqlalchemy():
+    """Tests that importing and starting the app on memory leaves SQL unloaded."""
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from be_task_ca.app import app\n"
+        "with TestClient(app) as client:\n"
+        "    client.get('/items/').raise_for_status()\n"
+        "print(any(name.startswith('sqlalchemy') for name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,58 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from be_task_ca.database import create_db_engine, engine_options, pool_status
+from be_task_ca.settings import Settings
+
+
+def test_statement_logging_is_off_by_default():
+    """Tests that engines do not echo statements unless asked to."""
+    assert engine_options(Settings().database_url, Settings())["echo"] is False
+
+
+def test_engine_options_follow_settings():
+    """Tests that the pool settings are passed on to the engine."""
+    settings = Settings(db_pool_size=20, db_max_overflow=5, db_pool_recycle=60)
+    options = engine_options(settings.database_url, settings)
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 5
+    assert options["pool_recycle"] == 60
+
+
+def test_statement_timeout_per_driver():
+    """Tests that the statement timeout is passed the way each driver expects."""
+    settings = Settings(db_statement_timeout_ms=500)
+    sync_options = engine_options(settings.database_url, settings)
+    async_options = engine_options(settings.async_database_url, settings)
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=500"}
+    assert async_options["connect_args"] == {
+        "server_settings": {"statement_timeout": "500"}
+    }
+
+
+def test_pool_status_of_queue_pool(tmp_path):
+    """Tests that the counters of a queue pool are reported without a connection."""
+    settings = Settings(
+        database_url=f"sqlite:///{tmp_path / 'test.db'}",
+        db_pool_size=4,
+        db_max_overflow=2,
+    )
+    engine = create_db_engine(settings)
+    try:
+        with engine.connect():
+            status = pool_status(engine, settings)
+    finally:
+        engine.dispose()
+    assert status["pool"] == "QueuePool"
+    assert status["size"] == 4
+    assert status["max_overflow"] == 2
+    assert status["checked_out"] == 1
+    assert status["saturation"] == 1 / 6
+
+
+def test_pool_status_of_other_pools():
+    """Tests that pools without queue counters are described instead of failing."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    status = pool_status(engine)
+    assert status["pool"] == "StaticPool"
+    assert isinstance(status["status"], str)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from be_task_ca.app import app
+from be_task_ca.container import build_use_cases
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.metrics import Histogram, Instrumented, registry
+from be_task_ca.settings import Settings
+
+
+@pytest.fixture
+def client():
+    InMemoryItemRepository.clear_storage()
+    registry.clear()
+    with TestClient(app) as client:
+        yield client
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Tests the Prometheus text format of a histogram."""
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(("a",), 0.05)
+    histogram.observe(("a",), 0.5)
+    histogram.observe(("a",), 5.0)
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="a",le="0.1"} 1',
+        'latency_seconds_bucket{route="a",le="1.0"} 2',
+        'latency_seconds_bucket{route="a",le="+Inf"} 3',
+        'latency_seconds_sum{route="a"} 5.55',
+        'latency_seconds_count{route="a"} 3',
+    ]
+
+
+def test_instrumented_times_coroutines_and_errors():
+    """Tests that calls are timed, including the ones that raise."""
+
+    class Repository:
+        async def find(self, fail: bool):
+            if fail:
+                raise ValueError("boom")
+            return "found"
+
+    histogram = Histogram("calls_seconds", "Calls.", ("repository", "method"))
+    repository = Instrumented(Repository(), histogram)
+    assert asyncio.run(repository.find(False)) == "found"
+    with pytest.raises(ValueError):
+        asyncio.run(repository.find(True))
+    assert 'calls_seconds_count{repository="Repository",method="find"} 2' in (
+        histogram.render()
+    )
+
+
+def test_metrics_endpoint_reports_every_layer(client):
+    """Tests that a request shows up per route, per use case and per repository."""
+    assert client.get("/items/").status_code == 200
+    assert client.get("/users/not-a-uuid").status_code == 422
+
+    body = client.get("/metrics").text
+    assert (
+        'http_request_duration_seconds_count{handler="get_items",method="GET",'
+        'status="200"} 1' in body
+    )
+    assert (
+        'http_request_duration_seconds_count{handler="get_user",method="GET",'
+        'status="422"} 1' in body
+    )
+    assert (
+        'usecase_call_duration_seconds_count{usecase="AsyncItemUseCase",'
+        'method="get_all_items"} 1' in body
+    )
+    assert (
+        "repository_call_duration_seconds_count"
+        '{repository="AsyncInMemoryItemRepository",method="get_all_items"} 1' in body
+    )
+
+
+def test_metrics_can_be_switched_off():
+    """Tests that no instrumentation is built when metrics are disabled."""
+    use_cases = build_use_cases(Settings(metrics_enabled=False))
+    assert not isinstance(use_cases.items, Instrumented)
+    assert not isinstance(use_cases.items.repository, Instrumented)
+
+
+def test_sql_repositories_record_pool_wait(sql_api):
+    """Tests that SQL calls record the time spent checking out a connection."""
+    registry.clear()
+    use_cases = build_use_cases(Settings(repository="sql"), sql_api)
+    asyncio.run(use_cases.items.get_all_items())
+    assert "db_pool_wait_seconds_count 1" in registry.render()
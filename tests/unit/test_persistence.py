@@ -0,0 +1,182 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.persistence import (
+    MemoryPersistence,
+    list_segments,
+    segment_path,
+)
+from be_task_ca.user.models.model import CartItem, User
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repositories():
+    InMemoryItemRepository.clear_storage()
+    InMemoryUserRepository.clear_storage()
+    yield
+    InMemoryItemRepository._journal = None
+    InMemoryUserRepository._journal = None
+
+
+class Persistences:
+    """Opens MemoryPersistence instances on one directory and stops them all."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.running: list[MemoryPersistence] = []
+
+    def open(self, fsync_interval: float = 0) -> MemoryPersistence:
+        persistence = MemoryPersistence(
+            self.directory, fsync_interval, snapshot_interval=0
+        )
+        persistence.open()
+        self.running.append(persistence)
+        return persistence
+
+    def close(self, persistence: MemoryPersistence):
+        self.running.remove(persistence)
+        persistence.close()
+
+    def crash(self, persistence: MemoryPersistence):
+        """Stop journaling without the clean shutdown snapshot, and lose the memory."""
+        self.running.remove(persistence)
+        persistence.log.close()
+        InMemoryItemRepository._journal = None
+        InMemoryUserRepository._journal = None
+        InMemoryItemRepository.clear_storage()
+        InMemoryUserRepository.clear_storage()
+
+
+@pytest.fixture
+def persistences(tmp_path):
+    persistences = Persistences(tmp_path)
+    yield persistences
+    for persistence in list(persistences.running):
+        persistences.close(persistence)
+
+
+def populate() -> tuple[Item, User]:
+    items, users = InMemoryItemRepository(), InMemoryUserRepository()
+    item = items.save_item(Item.create("Item", "Desc", 2.5, 10))
+    user = users.save_user(User.create("a@example.com", "A", "B", "hash"))
+    users.add_cart_item(CartItem(user.id, item.id, 2))
+    users.add_cart_items(user.id, [CartItem(user.id, item.id, 1)])
+    items.reserve_stock(
+        [Reservation.create(user.id, item.id, 3, NOW, timedelta(minutes=15))]
+    )
+    return item, user
+
+
+@pytest.mark.parametrize("fsync_interval", [0, 0.01])
+def test_recovers_from_the_log_after_a_crash(persistences, fsync_interval):
+    """Tests that replaying the write-ahead log restores both repositories."""
+    persistence = persistences.open(fsync_interval)
+    item, user = populate()
+    persistences.crash(persistence)
+
+    persistences.open(fsync_interval)
+    items, users = InMemoryItemRepository(), InMemoryUserRepository()
+    assert items.find_item_by_name("Item").quantity == 7
+    assert items.get_items_page(None, 10) == [items.find_item_by_id(item.id)]
+    assert users.find_user_by_email("A@example.com").id == user.id
+    assert users.find_cart_items_for_user_id(user.id) == [CartItem(user.id, item.id, 3)]
+
+    # The recovered reservation still expires and returns its stock
+    assert items.release_expired_reservations(NOW + timedelta(hours=1)) == 1
+    assert items.find_item_by_id(item.id).quantity == 10
+
+
+def test_snapshot_compacts_the_log(tmp_path, persistences):
+    """Tests that a snapshot replaces old segments and recovery combines both."""
+    persistence = persistences.open()
+    item, user = populate()
+    persistence.snapshot()
+    assert list_segments(tmp_path) == [1]
+
+    InMemoryUserRepository().add_cart_item(CartItem(user.id, item.id, 4))
+    persistences.crash(persistence)
+
+    persistences.open()
+    users = InMemoryUserRepository()
+    assert users.find_cart_items_for_user_id(user.id)[0].quantity == 7
+    assert InMemoryItemRepository().find_item_by_id(item.id).quantity == 7
+
+
+def tear_last_record(directory, segment: int = 0):
+    path = segment_path(directory, segment)
+    path.write_bytes(path.read_bytes()[:-3])
+
+
+def test_torn_tail_is_ignored(tmp_path, persistences):
+    """Tests that a record cut short by a crash is dropped, keeping the rest."""
+    persistence = persistences.open()
+    InMemoryItemRepository().save_item(Item.create("Kept", "Desc", 1.0, 1))
+    InMemoryItemRepository().save_item(Item.create("Torn", "Desc", 1.0, 1))
+    persistences.crash(persistence)
+    tear_last_record(tmp_path)
+
+    persistence = persistences.open()
+    items = InMemoryItemRepository()
+    assert [item.name for item in items.get_all_items()] == ["Kept"]
+
+    # New writes go to a fresh segment and survive a clean restart
+    items.save_item(Item.create("New", "Desc", 1.0, 1))
+    persistences.close(persistence)
+    InMemoryItemRepository.clear_storage()
+    persistences.open()
+    assert {item.name for item in items.get_all_items()} == {"Kept", "New"}
+
+
+def test_reservation_is_recovered_with_its_stock_or_not_at_all(tmp_path, persistences):
+    """Tests that a crash cannot keep the stock taken by a reservation but lose it."""
+    persistence = persistences.open()
+    items = InMemoryItemRepository()
+    item = items.save_item(Item.create("Item", "Desc", 2.5, 10))
+    items.reserve_stock(
+        [Reservation.create(uuid4(), item.id, 3, NOW, timedelta(minutes=15))]
+    )
+    persistences.crash(persistence)
+    tear_last_record(tmp_path)
+
+    persistences.open()
+    assert items.find_item_by_id(item.id).quantity == 10
+    assert items.release_expired_reservations(NOW + timedelta(hours=1)) == 0
+
+
+def test_durable_writes_leave_the_event_loop_free(persistences, monkeypatch):
+    """Tests that a write waiting for its fsync does not block the event loop."""
+    persistences.open(fsync_interval=0)
+    synced = threading.Event()
+    fsync = os.fsync
+
+    def slow_fsync(fd):
+        synced.wait(5)
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    repository = AsyncInMemoryItemRepository(durable_writes=True)
+
+    async def scenario():
+        save = asyncio.create_task(
+            repository.save_item(Item.create("Item", "Desc", 1.0, 1))
+        )
+        await asyncio.sleep(0.05)
+        assert not save.done()
+        synced.set()
+        return await save
+
+    item = asyncio.run(scenario())
+    assert InMemoryItemRepository().find_item_by_id(item.id) == item
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from be_task_ca.admin import ProfileRequestMiddleware, admin_router
+from be_task_ca.profiling import StackSampler
+from be_task_ca.settings import settings
+
+app = FastAPI()
+app.include_router(admin_router)
+app.add_middleware(ProfileRequestMiddleware)
+
+
+@app.get("/busy")
+async def busy():
+    busy_loop(0.05)
+    return {"done": True}
+
+
+def busy_loop(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+client = TestClient(app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+
+
+def test_sampler_collapses_stacks_of_busy_threads():
+    """Tests that a busy function dominates the samples of its thread."""
+    worker = threading.Thread(target=busy_loop, args=(0.2,))
+    worker.start()
+    stacks = StackSampler(interval=0.001, thread_id=worker.ident).start()
+    worker.join()
+    samples = stacks.stop()
+    busy = sum(count for stack, count in samples.items() if "busy_loop" in stack)
+    assert busy > 0
+    assert all(stack.split(";")[-1].startswith("busy_loop") for stack in samples)
+
+
+def test_profile_endpoint_requires_the_admin_token(admin_token):
+    """Tests that only an admin can start a profile."""
+    assert client.post("/admin/profile", params={"seconds": 0.01}).status_code == 403
+    response = client.post(
+        "/admin/profile", params={"seconds": 0.01}, headers={"X-Admin-Token": "wrong"}
+    )
+    assert response.status_code == 403
+
+
+def test_profile_endpoint_is_absent_without_a_token():
+    """Tests that the admin endpoints do not exist unless a token is configured."""
+    response = client.post("/admin/profile", params={"seconds": 0.01}, headers=ADMIN)
+    assert response.status_code == 404
+
+
+def test_profile_endpoint_returns_collapsed_stacks(admin_token):
+    """Tests that a time-bounded profile returns "stack count" lines."""
+    response = client.post(
+        "/admin/profile", params={"seconds": 0.05, "interval_ms": 1}, headers=ADMIN
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_single_request_profile(admin_token):
+    """Tests that X-Profile returns the stacks of the request instead of its body."""
+    response = client.get("/busy", headers={**ADMIN, "X-Profile": "1"})
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert "busy_loop" in response.text
+
+    # Without the admin token the header is ignored
+    response = client.get("/busy", headers={"X-Profile": "1"})
+    assert response.json() == {"done": True}
@@ -0,0 +1,35 @@
+import pytest
+
+from be_task_ca import server
+from be_task_ca.server import gunicorn_options, worker_count
+from be_task_ca.settings import Settings
+
+
+def test_sql_backend_runs_a_worker_per_core(monkeypatch):
+    """Tests that SQL deployments default to one worker per available core."""
+    monkeypatch.setattr(server, "available_cores", lambda: 6)
+    assert worker_count(Settings(repository="sql")) == 6
+    assert worker_count(Settings(repository="sql", workers=2)) == 2
+
+
+def test_memory_backend_refuses_multiple_workers():
+    """Tests that the per-process memory backend is never split across workers."""
+    assert worker_count(Settings(repository="memory")) == 1
+    with pytest.raises(ValueError, match="memory backend"):
+        worker_count(Settings(repository="memory", workers=4))
+
+
+def test_gunicorn_options():
+    """Tests the production server configuration."""
+    options = gunicorn_options(Settings(repository="sql", workers=3, port=9000))
+    assert options["bind"] == "0.0.0.0:9000"
+    assert options["workers"] == 3
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert options["preload_app"] is True
+
+
+def test_shared_backend_runs_a_worker_per_core(monkeypatch):
+    """Tests that the shared memory backend scales out like SQL."""
+    monkeypatch.setattr(server, "available_cores", lambda: 4)
+    assert worker_count(Settings(repository="shared")) == 4
+    assert worker_count(Settings(repository="shared", workers=8)) == 8
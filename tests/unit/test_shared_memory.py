@@ -0,0 +1,254 @@
+import asyncio
+import fcntl
+import os
+import stat
+import threading
+import time
+import subprocess
+import sys
+import textwrap
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from be_task_ca.item.models.model import Item, Reservation
+from be_task_ca.item.repositories.async_shared_memory_repository import (
+    AsyncSharedMemoryItemRepository,
+)
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.item.repositories.repository import ItemAlreadyExistsError
+from be_task_ca.item.repositories.shared_memory_repository import (
+    SharedMemoryItemRepository,
+)
+from be_task_ca.persistence import encode
+from be_task_ca.shared_memory import (
+    SharedMemoryStore,
+    SharedStoreFullError,
+    pack_record,
+    unpack_record,
+)
+from be_task_ca.user.models.model import User
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+from be_task_ca.user.repositories.shared_memory_repository import (
+    SharedMemoryUserRepository,
+)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repositories():
+    InMemoryItemRepository.clear_storage()
+    InMemoryUserRepository.clear_storage()
+    yield
+    InMemoryItemRepository.clear_storage()
+    InMemoryUserRepository.clear_storage()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedMemoryStore(tmp_path / "store", 2**20)
+    store.open()
+    yield store
+    store.close()
+
+
+def in_other_process(path, code: str) -> str:
+    """Run code against the store at path in a fresh worker process."""
+    script = textwrap.dedent(
+        f"""
+        from datetime import datetime, timedelta, timezone
+        from be_task_ca.item.models.model import Item, Reservation
+        from be_task_ca.item.repositories.shared_memory_repository import (
+            SharedMemoryItemRepository,
+        )
+        from be_task_ca.shared_memory import SharedMemoryStore
+        from be_task_ca.user.models.model import CartItem, User
+        from be_task_ca.user.repositories.shared_memory_repository import (
+            SharedMemoryUserRepository,
+        )
+        NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store = SharedMemoryStore({str(path)!r}, 2**20)
+        store.open()
+        items = SharedMemoryItemRepository(store)
+        users = SharedMemoryUserRepository(store)
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script + textwrap.dedent(code)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+def test_writes_of_other_processes_are_visible(store):
+    """Tests that every process serves the data written by any of them."""
+    items = SharedMemoryItemRepository(store)
+    users = SharedMemoryUserRepository(store)
+    assert items.get_all_items() == []
+
+    in_other_process(
+        store.path,
+        """
+        item = items.save_item(Item.create("Shared", "Desc", 2.5, 10))
+        user = users.save_user(User.create("a@example.com", "A", "B", "hash"))
+        items.reserve_stock(
+            [Reservation.create(user.id, item.id, 3, NOW, timedelta(minutes=15))]
+        )
+        users.add_cart_item(CartItem(user.id, item.id, 3))
+        """,
+    )
+
+    item = items.find_item_by_name("Shared")
+    assert item.quantity == 7
+    user = users.find_user_by_email("A@example.com")
+    lines = users.find_cart_lines_for_user_id(user.id)
+    assert [(line.name, line.quantity) for line in lines] == [("Shared", 3)]
+
+    # Writes validate against the data of every process
+    with pytest.raises(ItemAlreadyExistsError):
+        items.save_item(Item.create("Shared", "Other", 1.0, 1))
+
+
+def test_reservations_are_released_once_across_processes(store):
+    """Tests that a reservation swept by one worker is gone from the others."""
+    items = SharedMemoryItemRepository(store)
+    item = items.save_item(Item.create("Item", "Desc", 2.5, 10))
+    items.reserve_stock(
+        [Reservation.create(uuid4(), item.id, 4, NOW, timedelta(minutes=15))]
+    )
+
+    released = in_other_process(
+        store.path,
+        """
+        print(items.release_expired_reservations(NOW + timedelta(hours=1)))
+        """,
+    )
+
+    assert released == "1"
+    assert items.release_expired_reservations(NOW + timedelta(hours=1)) == 0
+    assert items.find_item_by_id(item.id).quantity == 10
+
+
+def test_full_log_is_compacted(tmp_path):
+    """Tests that a full log is rewritten as a dump that other processes reload."""
+    store = SharedMemoryStore(tmp_path / "store", 4096)
+    store.open()
+    try:
+        items = SharedMemoryItemRepository(store)
+        item = items.save_item(Item.create("Item", "Desc", 2.5, 0))
+        for quantity in range(1, 200):
+            item = items.save_item(Item(item.id, "Item", "Desc", 2.5, quantity))
+        generation = store._generation
+        assert generation > 0
+    finally:
+        store.close()
+
+    InMemoryItemRepository.clear_storage()
+    quantity = in_other_process(
+        tmp_path / "store", 'print(items.find_item_by_name("Item").quantity)'
+    )
+    assert quantity == "199"
+
+
+def test_write_that_does_not_fit_is_dropped(tmp_path):
+    """Tests that a write the store has no room for fails without applying."""
+    store = SharedMemoryStore(tmp_path / "store", 1024)
+    store.open()
+    try:
+        users = SharedMemoryUserRepository(store)
+        with pytest.raises(SharedStoreFullError):
+            for number in range(100):
+                users.save_user(User.create(f"{number}@example.com", "A", "B", "h"))
+        saved = len(users.get_all_users())
+        assert 0 < saved < 100
+        assert users.find_user_by_email(f"{saved}@example.com") is None
+    finally:
+        store.close()
+
+
+def test_store_file_is_private(tmp_path):
+    """Tests that the store is created for its owner only and refused otherwise."""
+    store = SharedMemoryStore(tmp_path / "store", 4096)
+    store.open()
+    store.close()
+    assert stat.S_IMODE(os.stat(tmp_path / "store").st_mode) == 0o600
+
+    os.chmod(tmp_path / "store", 0o644)
+    with pytest.raises(PermissionError):
+        SharedMemoryStore(tmp_path / "store", 4096).open()
+
+    os.symlink(tmp_path / "store", tmp_path / "link")
+    with pytest.raises(OSError):
+        SharedMemoryStore(tmp_path / "link", 4096).open()
+
+
+def test_records_round_trip_without_pickle():
+    """Tests that records are stored in the binary format and read back equal."""
+    item = Item.create("Item", None, 2.5, 10)
+    reservation = Reservation.create(uuid4(), item.id, 3, NOW, timedelta(minutes=15))
+    record = encode(("batch", [("item", item), ("reserve", reservation)]))
+    assert unpack_record(pack_record(record)) == record
+    assert unpack_record(pack_record(record))[1][1][-1] == NOW + timedelta(minutes=15)
+
+    for payload in (b"\x80\x04N.", pack_record(record)[:-1], b"(\x01\x00\x00\x00?"):
+        with pytest.raises(ValueError):
+            unpack_record(payload)
+
+
+def test_blocked_write_leaves_the_event_loop_free(store):
+    """Tests that a write waiting for another process's lock does not stall reads."""
+    items = AsyncSharedMemoryItemRepository(store)
+    # Another open file description behaves like another process holding the lock
+    other = open(store.path, "r+b")
+    fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+    unlock = threading.Timer(0.5, fcntl.flock, (other.fileno(), fcntl.LOCK_UN))
+
+    async def scenario():
+        unlock.start()
+        write = asyncio.create_task(items.save_item(Item.create("Item", None, 1, 1)))
+        started = time.monotonic()
+        await asyncio.sleep(0.05)
+        assert await items.get_all_items() == []
+        assert not write.done() and time.monotonic() - started < 0.5
+        await write
+        assert [item.name for item in await items.get_all_items()] == ["Item"]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        unlock.join()
+        other.close()
+
+
+def test_reads_catch_up_while_the_replica_is_busy(store):
+    """Tests that a read waits off the event loop for a busy replica to catch up."""
+    in_other_process(store.path, 'items.save_item(Item.create("Other", None, 1, 1))')
+    items = AsyncSharedMemoryItemRepository(store)
+    held, release = threading.Event(), threading.Event()
+
+    def hold_replica():
+        # Like a write of this process that is waiting for the file lock
+        with store._lock:
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_replica)
+    holder.start()
+    held.wait(5)
+
+    async def scenario():
+        read = asyncio.create_task(items.get_all_items())
+        await asyncio.sleep(0.05)
+        assert not read.done()
+        release.set()
+        assert [item.name for item in await read] == ["Other"]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        holder.join()
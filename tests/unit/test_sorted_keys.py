@@ -0,0 +1,39 @@
+import random
+
+from be_task_ca.sorted_keys import SortedKeys
+
+
+def test_keys_stay_sorted_across_chunks():
+    """Tests that adds and removals spanning many chunks keep the order."""
+    keys = [f"{number:05}" for number in range(1000)]
+    shuffled = keys[:]
+    random.Random(0).shuffle(shuffled)
+    sorted_keys = SortedKeys(load=8)
+    for key in shuffled:
+        sorted_keys.add(key)
+    sorted_keys.add(keys[0])
+    assert list(sorted_keys) == keys
+
+    removed = set(shuffled[:500])
+    for key in removed:
+        sorted_keys.discard(key)
+    sorted_keys.discard("missing")
+    assert list(sorted_keys) == [key for key in keys if key not in removed]
+    assert len(sorted_keys) == 500
+
+
+def test_update_merges_large_batches():
+    """Tests that a batch larger than a chunk is merged without duplicates."""
+    sorted_keys = SortedKeys(["b", "d"], load=2)
+    sorted_keys.update(["a", "b", "c", "e", "f"])
+    assert list(sorted_keys) == ["a", "b", "c", "d", "e", "f"]
+
+
+def test_page_continues_after_the_cursor():
+    """Tests that pages start after the cursor, also when it is not a key."""
+    sorted_keys = SortedKeys([f"{number:02}" for number in range(0, 40, 2)], load=4)
+    assert sorted_keys.page(None, 3) == ["00", "02", "04"]
+    assert sorted_keys.page("06", 5) == ["08", "10", "12", "14", "16"]
+    assert sorted_keys.page("07", 2) == ["08", "10"]
+    assert sorted_keys.page("37", 5) == ["38"]
+    assert sorted_keys.page("38", 5) == []
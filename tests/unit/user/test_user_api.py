@@ -1,7 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
-from uuid import uuid4
+from be_task_ca.container import build_use_cases
+from be_task_ca.settings import Settings
+from uuid import UUID, uuid4
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
 from be_task_ca.user.interface.api import user_router
 from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
 
@@ -11,9 +15,18 @@ app.include_router(user_router)
 client = TestClient(app)
 
 
+def create_item(name: str = "Test Item", quantity: int = 100) -> str:
+    item = InMemoryItemRepository().save_item(
+        Item.create(name, "Test Desc", 2.5, quantity)
+    )
+    return str(item.id)
+
+
 @pytest.fixture(autouse=True)
 def clear_in_memory_repository():
     InMemoryUserRepository.clear_storage()
+    InMemoryItemRepository.clear_storage()
+    app.state.use_cases = build_use_cases(Settings())
 
 
 def test_post_user():
@@ -93,7 +106,7 @@ def test_add_item_to_cart():
         },
     )
     user_id = user_create_response.json()["id"]
-    item_id = str(uuid4())  # Mock item ID
+    item_id = create_item()
     response = client.post(
         f"/users/{user_id}/cart",
         json={
@@ -118,7 +131,7 @@ def test_list_items_in_cart():
         },
     )
     user_id = user_create_response.json()["id"]
-    item_id = str(uuid4())  # Mock item ID
+    item_id = create_item()
     client.post(
         f"/users/{user_id}/cart",
         json={
@@ -131,3 +144,220 @@ def test_list_items_in_cart():
     assert len(response.json()) == 1
     assert response.json()[0]["item_id"] == item_id
     assert response.json()[0]["quantity"] == 2
+
+
+def test_post_user_duplicate_email_is_case_insensitive():
+    """Tests that a user cannot sign up twice with differently cased emails."""
+    payload = {
+        "email": "test@example.com",
+        "first_name": "Test",
+        "last_name": "User",
+        "hashed_password": "hashedpassword123",
+    }
+    assert client.post("/users/", json=payload).status_code == 200
+    response = client.post("/users/", json={**payload, "email": "Test@Example.COM"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with this email already exists"
+
+
+def test_add_same_item_to_cart_merges_quantity():
+    """Tests that adding an item already in the cart increases its quantity."""
+    user_create_response = client.post(
+        "/users/",
+        json={
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "hashed_password": "hashedpassword123",
+        },
+    )
+    user_id = user_create_response.json()["id"]
+    item_id = create_item()
+    for quantity in (2, 3):
+        client.post(
+            f"/users/{user_id}/cart", json={"item_id": item_id, "quantity": quantity}
+        )
+    response = client.get(f"/users/{user_id}/cart")
+    assert response.status_code == 200
+    assert response.json() == [{"user_id": user_id, "item_id": item_id, "quantity": 5}]
+
+
+def test_add_items_to_cart_in_batch():
+    """Tests that many items can be added to the user's cart in one request."""
+    user_create_response = client.post(
+        "/users/",
+        json={
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "hashed_password": "hashedpassword123",
+        },
+    )
+    user_id = user_create_response.json()["id"]
+    first_item_id, second_item_id = create_item("First"), create_item("Second")
+    client.post(
+        f"/users/{user_id}/cart", json={"item_id": first_item_id, "quantity": 1}
+    )
+    response = client.post(
+        f"/users/{user_id}/cart/batch",
+        json=[
+            {"item_id": first_item_id, "quantity": 2},
+            {"item_id": second_item_id, "quantity": 1},
+            {"item_id": second_item_id, "quantity": 4},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "Items added to cart successfully"
+    cart = client.get(f"/users/{user_id}/cart").json()
+    assert {line["item_id"]: line["quantity"] for line in cart} == {
+        first_item_id: 3,
+        second_item_id: 5,
+    }
+
+
+def test_add_items_to_cart_in_batch_unknown_user():
+    """Tests that a batch for an unknown user is rejected."""
+    response = client.post(
+        f"/users/{uuid4()}/cart/batch",
+        json=[{"item_id": str(uuid4()), "quantity": 1}],
+    )
+    assert response.status_code == 404
+
+
+def test_add_item_to_cart_reserves_stock():
+    """Tests that cart adds take stock and are refused once it runs out."""
+    user_create_response = client.post(
+        "/users/",
+        json={
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "hashed_password": "hashedpassword123",
+        },
+    )
+    user_id = user_create_response.json()["id"]
+    item_id = create_item(quantity=3)
+    cart_url = f"/users/{user_id}/cart"
+
+    assert (
+        client.post(cart_url, json={"item_id": item_id, "quantity": 2}).status_code
+        == 200
+    )
+    response = client.post(cart_url, json={"item_id": item_id, "quantity": 2})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Not enough stock"
+
+    # A batch that cannot be served in full reserves nothing
+    other_item_id = create_item("Other Item", quantity=5)
+    response = client.post(
+        f"{cart_url}/batch",
+        json=[
+            {"item_id": other_item_id, "quantity": 5},
+            {"item_id": item_id, "quantity": 2},
+        ],
+    )
+    assert response.status_code == 409
+    repository = InMemoryItemRepository()
+    assert repository.find_item_by_id(UUID(item_id)).quantity == 1
+    assert repository.find_item_by_id(UUID(other_item_id)).quantity == 5
+
+
+def test_add_unknown_item_to_cart():
+    """Tests that an item missing from the catalog cannot be added to a cart."""
+    user_create_response = client.post(
+        "/users/",
+        json={
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "hashed_password": "hashedpassword123",
+        },
+    )
+    user_id = user_create_response.json()["id"]
+    response = client.post(
+        f"/users/{user_id}/cart", json={"item_id": str(uuid4()), "quantity": 1}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Item not found"
+    assert client.get(f"/users/{user_id}/cart").status_code == 404
+
+
+@pytest.mark.parametrize("quantity", [0, -1])
+def test_add_non_positive_quantity_to_cart(quantity):
+    """Tests that cart lines need a positive quantity and leave stock untouched."""
+    user_create_response = client.post(
+        "/users/",
+        json={
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "hashed_password": "hashedpassword123",
+        },
+    )
+    user_id = user_create_response.json()["id"]
+    item_id = create_item(quantity=3)
+    line = {"item_id": item_id, "quantity": quantity}
+
+    response = client.post(f"/users/{user_id}/cart", json=line)
+    assert response.status_code == 422
+    response = client.post(
+        f"/users/{user_id}/cart/batch",
+        json=[{"item_id": item_id, "quantity": 1}, line],
+    )
+    assert response.status_code == 422
+    item = InMemoryItemRepository().find_item_by_id(UUID(item_id))
+    assert item.quantity == 3
+
+
+def test_get_cart_view_with_totals():
+    """Tests that the cart view joins item details and totals, and stays fresh."""
+    user_create_response = client.post(
+        "/users/",
+        json={
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "hashed_password": "hashedpassword123",
+        },
+    )
+    user_id = user_create_response.json()["id"]
+    item = InMemoryItemRepository().save_item(
+        Item.create("Test Item", "Test Desc", 2.5, 100)
+    )
+    client.post(f"/users/{user_id}/cart", json={"item_id": str(item.id), "quantity": 2})
+
+    response = client.get(f"/users/{user_id}/cart/view")
+    assert response.status_code == 200
+    assert response.json() == {
+        "lines": [
+            {
+                "item_id": str(item.id),
+                "name": "Test Item",
+                "unit_price": 2.5,
+                "quantity": 2,
+                "line_total": 5.0,
+            }
+        ],
+        "total": 5.0,
+    }
+
+    # Adding to the cart invalidates the cached view
+    client.post(f"/users/{user_id}/cart", json={"item_id": str(item.id), "quantity": 1})
+    response = client.get(f"/users/{user_id}/cart/view")
+    assert response.json()["total"] == 7.5
+
+
+def test_post_and_get_user_sql(sql_api):
+    """Tests that users can be created and fetched through the SQL repository."""
+    app.state.use_cases = build_use_cases(Settings(repository="sql"), sql_api)
+    payload = {
+        "email": "test@example.com",
+        "first_name": "Test",
+        "last_name": "User",
+        "hashed_password": "hashedpassword123",
+    }
+    response = client.post("/users/", json=payload)
+    assert response.status_code == 200
+    assert client.post("/users/", json=payload).status_code == 400
+    user_id = response.json()["id"]
+    assert client.get(f"/users/{user_id}").json() == response.json()
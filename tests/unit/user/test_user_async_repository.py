@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.async_shared_memory_repository import (
+    AsyncSharedMemoryItemRepository,
+)
+from be_task_ca.item.repositories.async_sql_repository import AsyncSQLItemRepository
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.user.models.model import CartItem, CartLine, User
+from be_task_ca.user.repositories.async_in_memory_repository import (
+    AsyncInMemoryUserRepository,
+)
+from be_task_ca.user.repositories.async_shared_memory_repository import (
+    AsyncSharedMemoryUserRepository,
+)
+from be_task_ca.user.repositories.async_sql_repository import AsyncSQLUserRepository
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+from be_task_ca.user.repositories.repository import UserAlreadyExistsError
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repositories():
+    InMemoryItemRepository.clear_storage()
+    InMemoryUserRepository.clear_storage()
+
+
+@pytest.fixture(params=["memory", "shared", "sql"])
+def repositories(request):
+    """An item and a user repository on the same backend."""
+    if request.param == "memory":
+        return AsyncInMemoryItemRepository(), AsyncInMemoryUserRepository()
+    if request.param == "shared":
+        store = request.getfixturevalue("shared_store")
+        return (
+            AsyncSharedMemoryItemRepository(store),
+            AsyncSharedMemoryUserRepository(store),
+        )
+    session_factory = request.getfixturevalue("sql_api")
+    return (
+        AsyncSQLItemRepository(session_factory),
+        AsyncSQLUserRepository(session_factory),
+    )
+
+
+def make_user(email="test@example.com") -> User:
+    return User.create(email, "Test", "User", "hashedpassword123")
+
+
+def test_save_and_find_user(repositories):
+    """Tests that a saved user can be found by id and by email."""
+    _, repository = repositories
+
+    async def scenario():
+        user = await repository.save_user(make_user())
+        assert (await repository.find_user_by_id(user.id)).email == user.email
+        assert (await repository.find_user_by_email(user.email)).id == user.id
+        assert await repository.find_user_by_email("unknown@example.com") is None
+        with pytest.raises(UserAlreadyExistsError):
+            await repository.save_user(make_user())
+
+    asyncio.run(scenario())
+
+
+def test_cart_lines_merge_and_join_items(repositories):
+    """Tests that cart lines add up and carry the name and price of their items."""
+    items, users = repositories
+
+    async def scenario():
+        user = await users.save_user(make_user())
+        item = await items.save_item(Item.create("Test Item", None, 2.5, 10))
+        await users.add_cart_item(CartItem(user.id, item.id, 1))
+        await users.add_cart_items(user.id, [CartItem(user.id, item.id, 2)])
+        assert await users.find_cart_items_for_user_id(user.id) == [
+            CartItem(user.id, item.id, 3)
+        ]
+        assert await users.find_cart_lines_for_user_id(user.id) == [
+            CartLine(item_id=item.id, quantity=3, name="Test Item", unit_price=2.5)
+        ]
+
+    asyncio.run(scenario())
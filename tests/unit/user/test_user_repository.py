@@ -0,0 +1,72 @@
+import sys
+import threading
+from uuid import uuid4
+
+import pytest
+from be_task_ca.user.models.model import CartItem, User
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+from be_task_ca.user.repositories.repository import UserAlreadyExistsError
+
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repository():
+    InMemoryUserRepository.clear_storage()
+
+
+@pytest.fixture
+def fast_thread_switching():
+    """Switch threads as often as possible to provoke interleavings."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_concurrently(target, threads=THREADS):
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        target()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+def test_concurrent_cart_adds_do_not_lose_updates(fast_thread_switching):
+    """Tests that concurrent quantity merges on one cart line all count."""
+    repository = InMemoryUserRepository()
+    user = repository.save_user(User.create("test@example.com", "Test", "User", "x"))
+    item_id = uuid4()
+    adds_per_thread = 500
+
+    def add_to_cart():
+        for _ in range(adds_per_thread):
+            repository.add_cart_item(CartItem(user.id, item_id, 1))
+
+    run_concurrently(add_to_cart)
+
+    (cart_item,) = repository.find_cart_items_for_user_id(user.id)
+    assert cart_item.quantity == THREADS * adds_per_thread
+
+
+def test_concurrent_signups_with_same_email_create_one_user(fast_thread_switching):
+    """Tests that only one of many racing signups for one email succeeds."""
+    repository = InMemoryUserRepository()
+    failures = []
+
+    def signup():
+        try:
+            repository.save_user(User.create("Test@Example.com", "Test", "User", "x"))
+        except UserAlreadyExistsError:
+            failures.append(True)
+
+    run_concurrently(signup)
+
+    assert len(repository.get_all_users()) == 1
+    assert len(failures) == THREADS - 1
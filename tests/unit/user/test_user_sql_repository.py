@@ -0,0 +1,120 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.repositories.sql_repository import SQLItemRepository
+from be_task_ca.user.models.model import CartItem, CartLine, User
+from be_task_ca.user.repositories.repository import UserAlreadyExistsError
+from be_task_ca.user.repositories.sql_repository import SQLUserRepository
+
+
+@pytest.fixture
+def repository(sql_session):
+    return SQLUserRepository(sql_session)
+
+
+def make_user(email="test@example.com") -> User:
+    return User.create(email, "Test", "User", "hashedpassword123")
+
+
+def test_save_and_find_user(repository):
+    """Tests that a saved user can be found by id and by email."""
+    user = repository.save_user(make_user())
+    assert repository.find_user_by_id(user.id) == user
+    assert repository.find_user_by_email("test@example.com") == user
+    assert repository.find_user_by_email("unknown@example.com") is None
+
+
+def test_save_user_with_taken_email(repository):
+    """Tests that a second user with the same email is rejected."""
+    repository.save_user(make_user())
+    with pytest.raises(UserAlreadyExistsError):
+        repository.save_user(make_user())
+
+
+def test_users_are_returned_with_their_carts(repository):
+    """Tests that users come back with the lines of their carts."""
+    user, other = repository.save_user(make_user()), repository.save_user(
+        make_user("other@example.com")
+    )
+    line = CartItem(user.id, uuid4(), 2)
+    repository.add_cart_items(user.id, [line])
+    assert repository.find_user_by_id(user.id).cart_items == [line]
+    carts = {found.id: found.cart_items for found in repository.get_all_users()}
+    assert carts == {user.id: [line], other.id: []}
+
+
+def test_cart_lines_are_joined_with_items(repository, sql_session):
+    """Tests that cart lines carry the name and price of their items."""
+    user = repository.save_user(make_user())
+    item = SQLItemRepository(sql_session).save_item(
+        Item.create("Test Item", None, 2.5, 10)
+    )
+    repository.add_cart_items(user.id, [CartItem(user.id, item.id, 3)])
+    assert repository.find_cart_lines_for_user_id(user.id) == [
+        CartLine(item_id=item.id, quantity=3, name="Test Item", unit_price=2.5)
+    ]
+
+
+@pytest.fixture
+def statements(sql_engine):
+    """Collects every SQL statement sent to the database."""
+    issued = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        issued.append(statement)
+
+    event.listen(sql_engine, "before_cursor_execute", record)
+    yield issued
+    event.remove(sql_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize(
+    "cart_loading, expected_statements",
+    [("grouped", 2), ("selectin", 2), ("joined", 1)],
+)
+def test_users_with_carts_take_constant_statements(
+    sql_session, statements, cart_loading, expected_statements
+):
+    """Tests that listing users with carts does not issue a query per user."""
+    repository = SQLUserRepository(sql_session, cart_loading=cart_loading)
+    for n in range(5):
+        user = repository.save_user(make_user(f"user{n}@example.com"))
+        repository.add_cart_items(user.id, [CartItem(user.id, uuid4(), n + 1)])
+    sql_session.expunge_all()
+    statements.clear()
+
+    users = repository.get_all_users()
+
+    assert len(statements) == expected_statements
+    assert sorted(user.cart_items[0].quantity for user in users) == [1, 2, 3, 4, 5]
+
+
+def test_add_cart_item_merges_in_one_statement(repository, statements):
+    """Tests that adding to a cart is a single upsert that adds up quantities."""
+    user = repository.save_user(make_user())
+    item_id = uuid4()
+    repository.add_cart_item(CartItem(user.id, item_id, 2))
+    statements.clear()
+
+    repository.add_cart_item(CartItem(user.id, item_id, 3))
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO cart_items")
+    assert "ON CONFLICT" in statements[0]
+    assert repository.find_cart_items_for_user_id(user.id) == [
+        CartItem(user.id, item_id, 5)
+    ]
+
+
+def test_add_cart_items_merges_repeated_items(repository):
+    """Tests that a batch naming one item twice adds up both quantities."""
+    user = repository.save_user(make_user())
+    item_id = uuid4()
+    repository.add_cart_items(
+        user.id, [CartItem(user.id, item_id, 1), CartItem(user.id, item_id, 4)]
+    )
+    assert repository.find_cart_items_for_user_id(user.id) == [
+        CartItem(user.id, item_id, 5)
+    ]
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from be_task_ca.cache import TTLCache
+from be_task_ca.container import build_use_cases
+from be_task_ca.item.models.model import Item
+from be_task_ca.item.repositories.async_in_memory_repository import (
+    AsyncInMemoryItemRepository,
+)
+from be_task_ca.item.repositories.in_memory_repository import InMemoryItemRepository
+from be_task_ca.item.reservations import AsyncStockReservations, SweepSchedule
+from be_task_ca.settings import Settings
+from be_task_ca.user.interface.schema import AddToCartRequest, CreateUserRequest
+from be_task_ca.user.repositories.async_in_memory_repository import (
+    AsyncInMemoryUserRepository,
+)
+from be_task_ca.user.repositories.in_memory_repository import InMemoryUserRepository
+from be_task_ca.user.usecases import AsyncUserUseCase
+
+
+class GatedUserRepository(AsyncInMemoryUserRepository):
+    """In-memory repository whose cart reads can be held after reading."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate: asyncio.Event | None = None
+
+    async def find_cart_lines_for_user_id(self, user_id):
+        lines = await super().find_cart_lines_for_user_id(user_id)
+        if self.gate is not None:
+            await self.gate.wait()
+        return lines
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_repositories():
+    InMemoryItemRepository.clear_storage()
+    InMemoryUserRepository.clear_storage()
+
+
+@pytest.fixture
+def use_case():
+    stock = AsyncStockReservations(
+        AsyncInMemoryItemRepository(),
+        ttl=timedelta(minutes=15),
+        schedule=SweepSchedule(interval=30),
+    )
+    return AsyncUserUseCase(GatedUserRepository(), stock, TTLCache(maxsize=10, ttl=30))
+
+
+def create_user(use_case) -> dict:
+    return asyncio.run(
+        use_case.create_user(
+            CreateUserRequest(
+                email="a@example.com",
+                first_name="A",
+                last_name="B",
+                hashed_password="hash",
+            )
+        )
+    )
+
+
+def test_create_user_hides_the_password_and_rejects_taken_emails(use_case):
+    """Tests that signups return the public fields and need a free email."""
+    user = create_user(use_case)
+    assert "hashed_password" not in user
+    assert asyncio.run(use_case.find_user_by_id(user["id"]))["email"] == user["email"]
+    with pytest.raises(HTTPException) as error:
+        create_user(use_case)
+    assert error.value.status_code == 400
+
+
+def test_adding_to_cart_reserves_stock(use_case):
+    """Tests that cart lines take stock, and that stock errors map to HTTP codes."""
+    user = create_user(use_case)
+    item = InMemoryItemRepository().save_item(Item.create("Item", None, 2.0, 3))
+
+    asyncio.run(
+        use_case.add_item_to_cart(
+            user["id"], AddToCartRequest(item_id=item.id, quantity=2)
+        )
+    )
+    assert InMemoryItemRepository().find_item_by_id(item.id).quantity == 1
+    view = asyncio.run(use_case.get_cart_view(user["id"]))
+    assert view.total == 4.0
+
+    for item_id, status in ((item.id, 409), (uuid4(), 404)):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(
+                use_case.add_items_to_cart(
+                    user["id"], [AddToCartRequest(item_id=item_id, quantity=2)]
+                )
+            )
+        assert error.value.status_code == status
+
+
+def test_cart_view_follows_cart_changes(use_case):
+    """Tests that a cached cart view is dropped when the cart changes."""
+    user = create_user(use_case)
+    item = InMemoryItemRepository().save_item(Item.create("Item", None, 2.0, 5))
+    line = AddToCartRequest(item_id=item.id, quantity=1)
+
+    asyncio.run(use_case.add_item_to_cart(user["id"], line))
+    assert asyncio.run(use_case.get_cart_view(user["id"])).total == 2.0
+    asyncio.run(use_case.add_items_to_cart(user["id"], [line, line]))
+    assert asyncio.run(use_case.get_cart_view(user["id"])).total == 6.0
+
+
+def test_cart_view_read_during_a_cart_write_is_not_cached(use_case):
+    """Tests that a view read before a cart write does not outlive the write."""
+    user = create_user(use_case)
+    item = InMemoryItemRepository().save_item(Item.create("Item", None, 2.0, 5))
+    line = AddToCartRequest(item_id=item.id, quantity=1)
+    asyncio.run(use_case.add_item_to_cart(user["id"], line))
+
+    async def read_during_write():
+        use_case.repository.gate = asyncio.Event()
+        read = asyncio.create_task(use_case.get_cart_view(user["id"]))
+        await asyncio.sleep(0)  # the read has the old lines and waits at the gate
+        await use_case.add_item_to_cart(user["id"], line)
+        use_case.repository.gate.set()
+        stale = await read
+        use_case.repository.gate = None
+        return stale, await use_case.get_cart_view(user["id"])
+
+    stale, fresh = asyncio.run(read_during_write())
+    assert stale.total == 2.0
+    assert fresh.total == 4.0
+
+
+def test_cart_views_are_only_cached_by_a_single_process(sql_api):
+    """Tests that the cart view cache is off when several workers serve carts."""
+    for options, cached in (
+        ({}, True),
+        ({"repository": "sql", "workers": 1}, True),
+        ({"repository": "sql", "workers": 4}, False),
+        ({"repository": "sql"}, False),
+    ):
+        settings = Settings(metrics_enabled=False, **options)
+        users = build_use_cases(settings, sql_api).users
+        assert (users.cart_view_cache.maxsize > 0) is cached